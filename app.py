@@ -4,21 +4,43 @@ FastAPI server for Customer Support Chatbot.
 Main application entry point.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
+from typing import Optional
+import hashlib
 import os
 
 from src.config import settings
+from src.core.llm_client import get_llm_client, close_llm_clients
+from src.core.batcher import close_llm_batchers
+from src.core.mcp_client import get_mcp_client, close_mcp_client
+from src.core.tool_cache import get_cached_tools
 from src.routes import chat, sessions, tools, health
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared LLM and MCP clients at startup and close them at shutdown."""
+    app.state.llm = get_llm_client()
+    # Fails fast if MCP is unreachable
+    app.state.mcp = await get_mcp_client()
+    await get_cached_tools(app.state.mcp)
+    yield
+    await close_mcp_client()
+    # Batchers dispatch through the LLM clients, so they are closed first
+    await close_llm_batchers()
+    await close_llm_clients()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -41,13 +63,29 @@ app.include_router(sessions.router)
 app.include_router(tools.router)
 
 
+# Chat UI, read once at import time so "/" never touches the filesystem
+def _load_index_html() -> Optional[bytes]:
+    """Read the chat UI's index.html, or None if it is not present."""
+    index_path = os.path.join(settings.STATIC_DIR, "index.html")
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, "rb") as f:
+        return f.read()
+
+
+_INDEX_HTML = _load_index_html()
+_INDEX_ETAG = f'"{hashlib.sha256(_INDEX_HTML).hexdigest()[:32]}"' if _INDEX_HTML else None
+
+
 # Root route - serve the chat UI
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     """Serve the chat interface."""
-    index_path = os.path.join(settings.STATIC_DIR, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if _INDEX_HTML is not None:
+        headers = {"ETag": _INDEX_ETAG}
+        if request.headers.get("if-none-match") == _INDEX_ETAG:
+            return Response(status_code=304, headers=headers)
+        return Response(_INDEX_HTML, media_type="text/html", headers=headers)
     return {"message": "Welcome to Customer Support Chatbot API", "docs": "/docs"}
 
 
@@ -58,5 +96,8 @@ if __name__ == "__main__":
         "app:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=True
+        reload=bool(os.getenv("DEV")),
+        # uvloop/httptools when installed (uvicorn[standard] on non-Windows)
+        loop="auto",
+        http="auto"
     )
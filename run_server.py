@@ -5,6 +5,33 @@ Simple script to run the FastAPI server.
 
 import uvicorn
 import os
+import sys
+
+from src.config import settings
+
+
+def _worker_count() -> int:
+    """
+    Number of worker processes to run.
+    
+    Sessions live in each worker's memory unless REDIS_URL is set, so without
+    Redis only a single worker is allowed.
+    
+    Returns:
+        WEB_CONCURRENCY if set, else one per CPU with Redis and 1 without
+    """
+    configured = os.getenv("WEB_CONCURRENCY")
+    if settings.REDIS_URL:
+        return int(configured or os.cpu_count() or 1)
+    
+    workers = int(configured or 1)
+    if workers > 1:
+        sys.exit(
+            f"WEB_CONCURRENCY={workers} requires REDIS_URL: without it each worker "
+            "keeps its own sessions and conversation history would be lost between requests"
+        )
+    return workers
+
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
@@ -14,11 +41,23 @@ if __name__ == "__main__":
     print(f"API docs available at http://{host}:{port}/docs")
     print(f"Health check at http://{host}:{port}/health")
     
-    uvicorn.run(
-        "app:app",
-        host=host,
-        port=port,
-        reload=True,
-        log_level="debug"
-    )
-
+    if os.getenv("DEV"):
+        # Single process with auto-reload for local development
+        uvicorn.run(
+            "app:app",
+            host=host,
+            port=port,
+            reload=True,
+            log_level="debug"
+        )
+    else:
+        uvicorn.run(
+            "app:app",
+            host=host,
+            port=port,
+            workers=_worker_count(),
+            # uvloop/httptools when installed (uvicorn[standard] on non-Windows)
+            loop="auto",
+            http="auto",
+            log_level="info"
+        )
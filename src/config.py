@@ -4,7 +4,9 @@ Application configuration.
 """
 
 import os
+from typing import Optional
 from dotenv import load_dotenv
+from redis.asyncio import Redis
 
 load_dotenv()
 
@@ -25,6 +27,20 @@ class Settings:
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1000"))
     
+    # Session Storage (Redis is used when REDIS_URL is set, otherwise in-process)
+    REDIS_URL = os.getenv("REDIS_URL")
+    SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+    # Seconds before a crashed worker's Redis session lock expires (renewed while a turn runs)
+    SESSION_LOCK_TIMEOUT = float(os.getenv("SESSION_LOCK_TIMEOUT", "120"))
+    # Seconds a turn waits for another worker's turn on the same session before giving up
+    SESSION_LOCK_WAIT = float(os.getenv("SESSION_LOCK_WAIT", "30"))
+    
+    # Maximum number of user/assistant messages kept per session
+    MAX_HISTORY = int(os.getenv("MAX_HISTORY", "40"))
+    
+    # Seconds before the cached MCP tool list is refetched
+    TOOLS_CACHE_TTL = float(os.getenv("TOOLS_CACHE_TTL", "60"))
+    
     # CORS Configuration
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
     
@@ -34,3 +50,22 @@ class Settings:
 
 settings = Settings()
 
+
+# Global Redis client instance
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Optional[Redis]:
+    """
+    Get or create the shared Redis client.
+    
+    Returns:
+        Redis client, or None if REDIS_URL is not configured
+    """
+    global _redis
+    
+    if _redis is None and settings.REDIS_URL:
+        _redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    
+    return _redis
+
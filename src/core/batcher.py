@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Micro-batching layer in front of LLMClient.chat_completion.
+
+Requests that arrive within a short window are dispatched together, so a
+self-hosted backend with continuous batching (vLLM, TGI, ...) sees them as
+one burst instead of a trickle of independent calls.
+"""
+
+import asyncio
+from typing import Optional, List, Dict, Tuple, Set
+from src.core.llm_client import LLMClient, ChatCompletionInput, ChatCompletionResponse
+
+
+# Maximum number of requests dispatched together
+BATCH_SIZE = 32
+
+# How long to wait for more requests after the first one arrives
+BATCH_WINDOW_MS = 5
+
+
+class LLMBatcher:
+    """Coalesces concurrent chat completion requests into batches."""
+    
+    def __init__(
+        self,
+        client: LLMClient,
+        batch_size: int = BATCH_SIZE,
+        batch_window_ms: float = BATCH_WINDOW_MS
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            client: LLM client used to dispatch the requests
+            batch_size: Maximum number of requests per batch
+            batch_window_ms: Time to wait for more requests, in milliseconds
+        """
+        self.client = client
+        self.batch_size = batch_size
+        self.batch_window = batch_window_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatches: Set[asyncio.Task] = set()
+    
+    def _ensure_worker(self):
+        """Start the background worker on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+    
+    async def submit(self, input_data: ChatCompletionInput) -> ChatCompletionResponse:
+        """
+        Submit a chat completion request and wait for its response.
+        
+        Args:
+            input_data: ChatCompletionInput model with all parameters
+        
+        Returns:
+            ChatCompletionResponse model
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((input_data, future))
+        return await future
+    
+    async def _run(self):
+        """Collect requests into batches and dispatch them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_window
+            
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Closed mid-window: still send what was collected
+                self._start_dispatch(batch)
+                raise
+            
+            self._start_dispatch(batch)
+    
+    def _start_dispatch(self, batch: List[Tuple[ChatCompletionInput, asyncio.Future]]):
+        """Dispatch in the background so the next batch can be collected meanwhile."""
+        task = self._loop.create_task(self._dispatch(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[ChatCompletionInput, asyncio.Future]]):
+        """Send a batch to the LLM concurrently and resolve each request's future."""
+        results = await asyncio.gather(
+            *[self.client.chat_completion(input_data) for input_data, _ in batch],
+            return_exceptions=True
+        )
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def close(self):
+        """Stop the background worker, then finish queued and in-flight requests."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        # Requests queued after the last batch was collected still get a response
+        queued = []
+        while self._queue is not None and not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        if queued:
+            await self._dispatch(queued)
+        
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+
+# Batchers per LLM client (clients are long-lived, so this stays small)
+_batchers: Dict[LLMClient, LLMBatcher] = {}
+
+
+def get_llm_batcher(client: LLMClient) -> LLMBatcher:
+    """
+    Get or create the batcher for an LLM client.
+    
+    Args:
+        client: LLM client to dispatch through
+    
+    Returns:
+        LLMBatcher shared by all callers using the same client
+    """
+    if client not in _batchers:
+        _batchers[client] = LLMBatcher(client)
+    return _batchers[client]
+
+
+async def close_llm_batchers():
+    """Close all batchers (call at shutdown, before the LLM clients are closed)."""
+    for batcher in _batchers.values():
+        await batcher.close()
+    _batchers.clear()
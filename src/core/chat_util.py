@@ -3,18 +3,122 @@
 Chat utility that integrates LLM client with MCP client for tool calling.
 """
 
+import asyncio
 import json
-from typing import Optional, List, Dict, Any, AsyncIterator
+import logging
+import orjson
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Deque, Final
+from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
+from src.config import settings, get_redis
 from src.core.llm_client import (
     get_llm_client, 
     LLMClient,
     Message,
     ChatCompletionInput,
     ChatCompletionResponse,
-    ToolDefinition,
-    FunctionDefinition
+    ToolCall,
+    ToolDefinition
 )
 from src.core.mcp_client import get_mcp_client, MCPClient
+from src.core.batcher import get_llm_batcher
+from src.core.tool_cache import get_cached_tools, get_read_only_tools
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix for persisted conversation histories
+SESSION_KEY_PREFIX = "sess:"
+
+# Redis key prefix for the per-session turn locks shared across workers
+SESSION_LOCK_PREFIX = "lock:sess:"
+
+
+class SessionBusyError(Exception):
+    """Raised when another worker holds a session's turn lock for too long."""
+
+
+def _session_key(session_id: str) -> str:
+    """Build the Redis key holding a session's conversation history."""
+    return f"{SESSION_KEY_PREFIX}{session_id}"
+
+
+# In-process turn locks per session ID, shared by every ChatSession instance for
+# that ID and dropped once no instance holds them
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _get_session_lock(session_id: str) -> asyncio.Lock:
+    """Get the in-process lock serializing turns on a session."""
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = _session_locks[session_id] = asyncio.Lock()
+    return lock
+
+
+# Default system message for customer support
+DEFAULT_SYSTEM_MESSAGE: Final[str] = """You are a helpful customer support agent for a company that sells computer products including monitors, printers, computers, and accessories.
+
+Your responsibilities:
+- Help customers find products they're looking for
+- Provide detailed product information (SKU, price, inventory, descriptions)
+- Assist with order placement and tracking
+- Verify customer identity and provide account information when needed
+- Provide excellent, friendly customer service
+
+Available product categories: Computers, Monitors, Printers, Accessories
+
+Guidelines:
+- Always be polite and professional
+- Use the available tools to look up accurate, real-time information
+- Don't make up product details - always use the tools to get current data
+- To verify a customer's identity, ask for their email and PIN, then use the verify_customer tool
+- Once identity is verified using the tool, you can safely provide customer information including customer ID, order history, and account details
+- When creating orders, confirm all details with the customer first
+- Provide clear, concise responses
+- If a customer asks about a product, search for it or list products in that category
+
+Remember: You have access to real-time product inventory, customer data, and order management tools. Use them to help customers effectively!"""
+
+# Validated once and shared by every session using the default prompt
+_DEFAULT_SYSTEM_MSG: Final[Message] = Message(role="system", content=DEFAULT_SYSTEM_MESSAGE)
+
+
+def _parse_tool_args(arguments: str) -> Dict[str, Any]:
+    """Parse tool call arguments, falling back to no arguments on invalid JSON."""
+    try:
+        return orjson.loads(arguments)
+    except orjson.JSONDecodeError:
+        return {}
+
+
+def _format_tool_result(result: Any) -> str:
+    """Convert a tool result (or the exception it raised) to a string for the LLM."""
+    if isinstance(result, BaseException):
+        return json.dumps({"error": f"Tool execution failed: {str(result)}"})
+    # Compact JSON; indentation only costs tokens
+    if isinstance(result, (dict, list)):
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+    elif isinstance(result, str):
+        return result
+    else:
+        return str(result)
+
+
+def _tool_messages(tool_calls: List[ToolCall], contents: List[str]) -> List[Message]:
+    """Build the tool result messages answering each tool call, in order."""
+    return [
+        Message(
+            role="tool",
+            tool_call_id=tool_call.id,
+            name=tool_call.function.name,
+            content=content
+        )
+        for tool_call, content in zip(tool_calls, contents)
+    ]
 
 
 class ChatSession:
@@ -25,7 +129,8 @@ class ChatSession:
         session_id: str,
         system_message: Optional[str] = None,
         llm_client: Optional[LLMClient] = None,
-        mcp_client: Optional[MCPClient] = None
+        mcp_client: Optional[MCPClient] = None,
+        redis: Optional[Redis] = None
     ):
         """
         Initialize a chat session.
@@ -35,38 +140,113 @@ class ChatSession:
             system_message: System message for the LLM
             llm_client: Optional LLM client instance
             mcp_client: Optional MCP client instance
+            redis: Optional Redis client for persisting history (defaults to the
+                shared client when REDIS_URL is set)
         """
         self.session_id = session_id
-        self.conversation_history: List[Dict[str, Any]] = []
-        self.system_message = system_message or self._default_system_message()
+        self.system_message = system_message or DEFAULT_SYSTEM_MESSAGE
+        # Validated history (user/assistant turns), bounded to the last MAX_HISTORY messages
+        self._messages: Deque[Message] = deque(maxlen=settings.MAX_HISTORY)
+        if self.system_message is DEFAULT_SYSTEM_MESSAGE:
+            self._system_msg: Optional[Message] = _DEFAULT_SYSTEM_MSG
+        else:
+            self._system_msg = (
+                Message(role="system", content=self.system_message) if self.system_message else None
+            )
         self.llm_client = llm_client or get_llm_client()
+        self._batcher = get_llm_batcher(self.llm_client)
         self.mcp_client = mcp_client
-        self._mcp_tools_formatted: Optional[List[Dict[str, Any]]] = None
+        self.redis = redis if redis is not None else get_redis()
+        # Serializes overlapping turns on this session ID (e.g. double-submits),
+        # even when each request builds its own ChatSession
+        self._lock = _get_session_lock(session_id)
     
-    def _default_system_message(self) -> str:
-        """Default system message for customer support."""
-        return """You are a helpful customer support agent for a company that sells computer products including monitors, printers, computers, and accessories.
-
-Your responsibilities:
-- Help customers find products they're looking for
-- Provide detailed product information (SKU, price, inventory, descriptions)
-- Assist with order placement and tracking
-- Verify customer identity and provide account information when needed
-- Provide excellent, friendly customer service
-
-Available product categories: Computers, Monitors, Printers, Accessories
-
-Guidelines:
-- Always be polite and professional
-- Use the available tools to look up accurate, real-time information
-- Don't make up product details - always use the tools to get current data
-- To verify a customer's identity, ask for their email and PIN, then use the verify_customer tool
-- Once identity is verified using the tool, you can safely provide customer information including customer ID, order history, and account details
-- When creating orders, confirm all details with the customer first
-- Provide clear, concise responses
-- If a customer asks about a product, search for it or list products in that category
-
-Remember: You have access to real-time product inventory, customer data, and order management tools. Use them to help customers effectively!"""
+    @property
+    def conversation_history(self) -> List[Dict[str, Any]]:
+        """Conversation history as plain dicts, derived from the Message history."""
+        return [msg.model_dump(exclude_none=True) for msg in self._messages]
+    
+    @conversation_history.setter
+    def conversation_history(self, history: List[Dict[str, Any]]):
+        self._messages = deque((Message(**msg) for msg in history), maxlen=settings.MAX_HISTORY)
+    
+    def _build_messages(self) -> List[Message]:
+        """Build the message list for an LLM call from the stored history."""
+        if self._system_msg is None:
+            return list(self._messages)
+        return [self._system_msg, *self._messages]
+    
+    @asynccontextmanager
+    async def _turn(self):
+        """
+        Hold the session's turn lock for a load-update-save cycle.
+        
+        The in-process lock orders turns within this worker; with Redis, a Redis
+        lock also orders them across workers so no turn overwrites another. The
+        Redis lock's TTL is renewed while the turn runs, so only a crashed worker
+        lets it expire.
+        
+        Raises:
+            SessionBusyError: If the Redis lock is not acquired within
+                SESSION_LOCK_WAIT seconds
+        """
+        async with self._lock:
+            if self.redis is None:
+                yield
+                return
+            
+            lock = self.redis.lock(
+                f"{SESSION_LOCK_PREFIX}{self.session_id}",
+                timeout=settings.SESSION_LOCK_TIMEOUT,
+                blocking_timeout=settings.SESSION_LOCK_WAIT
+            )
+            if not await lock.acquire():
+                raise SessionBusyError(
+                    f"Session {self.session_id} is busy with another message, try again shortly"
+                )
+            
+            renewal = asyncio.create_task(self._renew_lock(lock))
+            try:
+                yield
+            finally:
+                renewal.cancel()
+                try:
+                    await lock.release()
+                except LockError:
+                    # The lock expired (e.g. the event loop stalled past its TTL); the turn is done anyway
+                    logger.warning("Redis turn lock for session %s was lost before release", self.session_id)
+    
+    async def _renew_lock(self, lock: Lock):
+        """Reset the Redis turn lock's TTL every third of it until cancelled."""
+        while True:
+            await asyncio.sleep(settings.SESSION_LOCK_TIMEOUT / 3)
+            try:
+                await lock.reacquire()
+            except LockError:
+                logger.warning("Redis turn lock for session %s expired mid-turn", self.session_id)
+                return
+            except RedisError:
+                # Transient; the TTL still has two thirds left for the next attempt
+                logger.warning("Failed to renew Redis turn lock for session %s", self.session_id, exc_info=True)
+    
+    async def _load_history(self):
+        """Load conversation history from Redis (no-op without Redis)."""
+        if self.redis is None:
+            return
+        
+        data = await self.redis.get(_session_key(self.session_id))
+        self.conversation_history = orjson.loads(data) if data else []
+    
+    async def _save_history(self):
+        """Persist conversation history to Redis with a TTL (no-op without Redis)."""
+        if self.redis is None:
+            return
+        
+        await self.redis.set(
+            _session_key(self.session_id),
+            orjson.dumps(self.conversation_history),
+            ex=settings.SESSION_TTL
+        )
     
     async def _get_mcp_client(self) -> MCPClient:
         """Get or initialize MCP client."""
@@ -78,81 +258,80 @@ Remember: You have access to real-time product inventory, customer data, and ord
         """
         Convert MCP tools to OpenAI function calling format using Pydantic models.
         
+        The converted tools come from a process-wide TTL cache shared by all sessions.
+        
         Returns:
             List of ToolDefinition models or None if no tools
         """
-        if self._mcp_tools_formatted is not None:
-            return self._mcp_tools_formatted
-        
-        mcp = await self._get_mcp_client()
-        
-        if not mcp.tools:
-            return None
-        
-        # Convert MCP tools to Pydantic ToolDefinition models
-        tools = []
-        for tool in mcp.tools:
-            # Extract tool information
-            tool_name = tool.get("name", "")
-            tool_desc = tool.get("description", "")
-            tool_input = tool.get("inputSchema", {})
-            
-            # Ensure the schema has the correct structure for OpenAI
-            # OpenAI requires the full JSON Schema with type: "object"
-            if tool_input and "type" not in tool_input:
-                # If no type specified, wrap it properly
-                tool_input = {
-                    "type": "object",
-                    "properties": tool_input.get("properties", {}),
-                    "required": tool_input.get("required", [])
-                }
-            elif not tool_input:
-                # If no schema provided, use empty object schema
-                tool_input = {
-                    "type": "object",
-                    "properties": {}
-                }
-            
-            # Create Pydantic models
-            function_def = FunctionDefinition(
-                name=tool_name,
-                description=tool_desc,
-                parameters=tool_input
-            )
-            
-            tool_def = ToolDefinition(
-                type="function",
-                function=function_def
-            )
-            tools.append(tool_def)
-        
-        self._mcp_tools_formatted = tools if tools else None
-        return self._mcp_tools_formatted
+        return await get_cached_tools(await self._get_mcp_client())
     
-    async def _execute_tool_call(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+    async def _execute_tool_calls(
+        self,
+        tool_calls: List[ToolCall],
+        turn_cache: Optional[Dict[Tuple[str, str], str]] = None
+    ) -> List[Message]:
         """
-        Execute a tool call via MCP client.
+        Execute all tool calls requested in one assistant message concurrently.
+        
+        Calls to tools annotated as read-only are deduplicated: identical calls
+        (same name and arguments) run once per turn and share their result, kept
+        in turn_cache for later iterations. Every other call is treated as a write
+        and always runs, once per call; it also clears turn_cache so no stale read
+        is served after it. Failed calls are never cached, so they can be retried.
         
         Args:
-            tool_name: Name of the tool to call
-            arguments: Arguments for the tool
-            
+            tool_calls: Tool calls from the LLM response
+            turn_cache: Read-only results already fetched this turn, keyed by
+                (tool name, canonical JSON arguments); updated in place
+        
         Returns:
-            JSON string of tool result
+            Tool result messages, in the same order as the tool calls
         """
+        if turn_cache is None:
+            turn_cache = {}
+        
         try:
             mcp = await self._get_mcp_client()
-            result = await mcp.call_tool(tool_name, arguments)
-            
-            # Convert result to JSON string for LLM
-            if isinstance(result, (dict, list)):
-                return json.dumps(result, indent=2)
-            elif isinstance(result, str):
-                return result
-            else:
-                return str(result)
+            read_only = await get_read_only_tools(mcp)
         except Exception as e:
-            return json.dumps({"error": f"Tool execution failed: {str(e)}"})
+            contents = [_format_tool_result(e)] * len(tool_calls)
+            return _tool_messages(tool_calls, contents)
+        
+        # Result slot per call: (name, canonical arguments) for reads, the call's index for writes
+        slots: List[Any] = []
+        results: Dict[Any, str] = {}
+        pending: Dict[Any, Tuple[str, Dict[str, Any]]] = {}
+        for index, tool_call in enumerate(tool_calls):
+            tool_name = tool_call.function.name
+            arguments = _parse_tool_args(tool_call.function.arguments)
+            if tool_name in read_only:
+                slot = (tool_name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS).decode())
+                if slot in turn_cache:
+                    results[slot] = turn_cache[slot]
+            else:
+                slot = index
+            slots.append(slot)
+            if slot not in results and slot not in pending:
+                pending[slot] = (tool_name, arguments)
+        
+        if pending:
+            # One bounded fan-out to the MCP server for all new calls
+            try:
+                outcomes = await mcp.call_tools_batch(list(pending.values()))
+            except Exception as e:
+                outcomes = [e] * len(pending)
+            
+            wrote = False
+            for slot, outcome in zip(pending, outcomes):
+                results[slot] = _format_tool_result(outcome)
+                if isinstance(slot, int):
+                    wrote = True
+                elif not isinstance(outcome, BaseException):
+                    turn_cache[slot] = results[slot]
+            if wrote:
+                turn_cache.clear()
+        
+        return _tool_messages(tool_calls, [results[slot] for slot in slots])
     
     async def chat(
         self,
@@ -170,39 +349,28 @@ Remember: You have access to real-time product inventory, customer data, and ord
             temperature: LLM temperature
             max_tokens: Maximum tokens to generate
             max_tool_iterations: Maximum number of tool call iterations
-            
+        
         Returns:
             Assistant's final response
         """
-        # Add user message to history
-        self.conversation_history.append({"role": "user", "content": user_message})
-        
-        # Build messages for LLM using Pydantic models
-        messages: List[Message] = []
-        if self.system_message:
-            messages.append(Message(role="system", content=self.system_message))
-        
-        # Convert conversation history to Message models
-        for msg in self.conversation_history:
-            messages.append(Message(
-                role=msg["role"],
-                content=msg.get("content"),
-                tool_calls=msg.get("tool_calls"),
-                tool_call_id=msg.get("tool_call_id"),
-                name=msg.get("name")
-            ))
-        
-        # Get available tools
-        tools = await self._get_tools_for_llm()
-        
-        # Conversation loop with tool calling
-        iteration = 0
-        while iteration < max_tool_iterations:
-            iteration += 1
+        async with self._turn():
+            await self._load_history()
             
-            # Create input using Pydantic model
-            input_data = ChatCompletionInput(
-                messages=messages,
+            # Add user message to history
+            self._messages.append(Message(role="user", content=user_message))
+            
+            # Working copy for this turn; tool call messages stay local to the turn
+            messages = self._build_messages()
+            
+            # Get available tools
+            tools = await self._get_tools_for_llm()
+            
+            # Read-only tool results already fetched this turn, reused for repeated calls
+            turn_cache: Dict[Tuple[str, str], str] = {}
+            
+            # Validate the per-turn parameters once; iterations only swap in the messages
+            base_input = ChatCompletionInput(
+                messages=[],
                 temperature=temperature,
                 max_tokens=max_tokens,
                 tools=tools,
@@ -210,58 +378,41 @@ Remember: You have access to real-time product inventory, customer data, and ord
                 stream=False
             )
             
-            # Call LLM with tools
-            response: ChatCompletionResponse = await self.llm_client.chat_completion(input_data)
-            
-            # Create assistant message
-            assistant_message = Message(
-                role="assistant",
-                content=response.content,
-                tool_calls=response.tool_calls
-            )
-            
-            messages.append(assistant_message)
-            
-            # Check if LLM wants to call tools
-            if not response.tool_calls:
-                # No tool calls, we're done
-                response_text = response.content or ""
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": response_text
-                })
-                return response_text
-            
-            # Execute tool calls
-            tool_results = []
-            for tool_call in response.tool_calls:
-                tool_name = tool_call["function"]["name"]
-                try:
-                    tool_args = json.loads(tool_call["function"]["arguments"])
-                except json.JSONDecodeError:
-                    tool_args = {}
+            # Conversation loop with tool calling
+            iteration = 0
+            while iteration < max_tool_iterations:
+                iteration += 1
+                
+                input_data = base_input.model_copy(update={"messages": list(messages)})
                 
-                # Execute tool
-                tool_result = await self._execute_tool_call(tool_name, tool_args)
+                # Call LLM with tools
+                response: ChatCompletionResponse = await self._batcher.submit(input_data)
                 
-                # Add tool result to messages
-                tool_results.append(Message(
-                    role="tool",
-                    tool_call_id=tool_call["id"],
-                    name=tool_name,
-                    content=tool_result
-                ))
+                # Create assistant message
+                assistant_message = Message(
+                    role="assistant",
+                    content=response.content,
+                    tool_calls=response.tool_calls
+                )
+                
+                messages.append(assistant_message)
+                
+                # Check if LLM wants to call tools
+                if not response.tool_calls:
+                    # No tool calls, we're done
+                    response_text = response.content or ""
+                    self._messages.append(Message(role="assistant", content=response_text))
+                    await self._save_history()
+                    return response_text
+                
+                # Execute tool calls and add results to messages for next iteration
+                messages.extend(await self._execute_tool_calls(response.tool_calls, turn_cache))
             
-            # Add tool results to messages for next iteration
-            messages.extend(tool_results)
-        
-        # If we hit max iterations, return the last response
-        final_response = messages[-1].content if messages[-1].content else "I apologize, but I encountered an issue processing your request."
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": final_response
-        })
-        return final_response
+            # If we hit max iterations, return the last response
+            final_response = messages[-1].content if messages[-1].content else "I apologize, but I encountered an issue processing your request."
+            self._messages.append(Message(role="assistant", content=final_response))
+            await self._save_history()
+            return final_response
     
     async def chat_stream(
         self,
@@ -274,44 +425,36 @@ Remember: You have access to real-time product inventory, customer data, and ord
         Process a user message and stream assistant response.
         Note: Tool calls are handled synchronously, then streaming continues.
         
+        This must stay an async generator: the SSE route iterates it on the
+        event loop, whereas a sync iterator would be offloaded to a thread.
+        
         Args:
             user_message: User's message
             temperature: LLM temperature
             max_tokens: Maximum tokens to generate
             max_tool_iterations: Maximum number of tool call iterations
-            
+        
         Yields:
             Chunks of assistant response text
         """
-        # Add user message to history
-        self.conversation_history.append({"role": "user", "content": user_message})
-        
-        # Build messages for LLM using Pydantic models
-        messages: List[Message] = []
-        if self.system_message:
-            messages.append(Message(role="system", content=self.system_message))
-        
-        # Convert conversation history to Message models
-        for msg in self.conversation_history:
-            messages.append(Message(
-                role=msg["role"],
-                content=msg.get("content"),
-                tool_calls=msg.get("tool_calls"),
-                tool_call_id=msg.get("tool_call_id"),
-                name=msg.get("name")
-            ))
-        
-        # Get available tools
-        tools = await self._get_tools_for_llm()
-        
-        # First, handle any tool calls (non-streaming)
-        iteration = 0
-        while iteration < max_tool_iterations:
-            iteration += 1
+        async with self._turn():
+            await self._load_history()
+            
+            # Add user message to history
+            self._messages.append(Message(role="user", content=user_message))
+            
+            # Working copy for this turn; tool call messages stay local to the turn
+            messages = self._build_messages()
             
-            # Create input using Pydantic model
-            input_data = ChatCompletionInput(
-                messages=messages,
+            # Get available tools
+            tools = await self._get_tools_for_llm()
+            
+            # Read-only tool results already fetched this turn, reused for repeated calls
+            turn_cache: Dict[Tuple[str, str], str] = {}
+            
+            # Validate the per-turn parameters once; iterations only swap in the messages
+            base_input = ChatCompletionInput(
+                messages=[],
                 temperature=temperature,
                 max_tokens=max_tokens,
                 tools=tools,
@@ -319,69 +462,67 @@ Remember: You have access to real-time product inventory, customer data, and ord
                 stream=False
             )
             
-            # Check if we need tools (non-streaming call)
-            response: ChatCompletionResponse = await self.llm_client.chat_completion(input_data)
-            
-            if not response.tool_calls:
-                # No tool calls, break and stream response
-                break
+            # First, handle any tool calls (non-streaming)
+            iteration = 0
+            while iteration < max_tool_iterations:
+                iteration += 1
+                
+                input_data = base_input.model_copy(update={"messages": list(messages)})
+                
+                # Check if we need tools (non-streaming call)
+                response: ChatCompletionResponse = await self._batcher.submit(input_data)
+                
+                if not response.tool_calls:
+                    # No tool calls, break and stream response
+                    break
+                
+                # Create assistant message
+                assistant_message = Message(
+                    role="assistant",
+                    content=response.content,
+                    tool_calls=response.tool_calls
+                )
+                messages.append(assistant_message)
+                
+                # Execute tool calls
+                messages.extend(await self._execute_tool_calls(response.tool_calls, turn_cache))
             
-            # Create assistant message
-            assistant_message = Message(
-                role="assistant",
-                content=response.content,
-                tool_calls=response.tool_calls
-            )
-            messages.append(assistant_message)
+            # Now stream the final response
+            stream_input = base_input.model_copy(update={
+                "messages": messages,
+                "tools": None,
+                "tool_choice": None,
+                "stream": True
+            })
             
-            # Execute tool calls
-            tool_results = []
-            for tool_call in response.tool_calls:
-                tool_name = tool_call["function"]["name"]
-                try:
-                    tool_args = json.loads(tool_call["function"]["arguments"])
-                except json.JSONDecodeError:
-                    tool_args = {}
-                
-                tool_result = await self._execute_tool_call(tool_name, tool_args)
-                tool_results.append(Message(
-                    role="tool",
-                    tool_call_id=tool_call["id"],
-                    name=tool_name,
-                    content=tool_result
-                ))
+            full_response = ""
+            async for chunk in self.llm_client.chat_completion_stream(stream_input):
+                full_response += chunk
+                yield chunk
             
-            messages.extend(tool_results)
-        
-        # Now stream the final response
-        stream_input = ChatCompletionInput(
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=True
-        )
-        
-        full_response = ""
-        async for chunk in self.llm_client.chat_completion_stream(stream_input):
-            full_response += chunk
-            yield chunk
-        
-        # Add to conversation history
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": full_response
-        })
+            # Add to conversation history
+            self._messages.append(Message(role="assistant", content=full_response))
+            await self._save_history()
     
     def reset(self):
         """Reset conversation history for this session."""
-        self.conversation_history = []
+        self._messages.clear()
+    
+    @property
+    def message_count(self) -> int:
+        """Number of messages in the conversation history."""
+        return len(self._messages)
+    
+    def last_message(self) -> Optional[Dict[str, Any]]:
+        """Get the most recent message as a plain dict, or None if there is none."""
+        return self._messages[-1].model_dump(exclude_none=True) if self._messages else None
     
     def get_history(self) -> List[Dict[str, Any]]:
-        """Get conversation history."""
-        return self.conversation_history.copy()
+        """Get conversation history as a list of plain dicts (a fresh projection)."""
+        return self.conversation_history
 
 
-# Global session storage
+# In-process session storage, used only when Redis is not configured
 _sessions: Dict[str, ChatSession] = {}
 
 
@@ -392,13 +533,25 @@ async def get_chat_session(
     """
     Get or create a chat session.
     
+    With Redis configured, a lightweight session is rebuilt on every call and
+    its history is loaded from Redis at the start of each turn, so any worker
+    can serve any session.
+    
     Args:
         session_id: Unique session identifier
         system_message: Optional system message override
-        
+    
     Returns:
         ChatSession instance
     """
+    redis = get_redis()
+    if redis is not None:
+        return ChatSession(
+            session_id=session_id,
+            system_message=system_message,
+            redis=redis
+        )
+    
     if session_id not in _sessions:
         _sessions[session_id] = ChatSession(
             session_id=session_id,
@@ -407,18 +560,68 @@ async def get_chat_session(
     return _sessions[session_id]
 
 
-def reset_session(session_id: str):
+async def reset_session(session_id: str):
     """Reset a chat session."""
-    if session_id in _sessions:
+    redis = get_redis()
+    if redis is not None:
+        await redis.delete(_session_key(session_id))
+    elif session_id in _sessions:
         _sessions[session_id].reset()
 
 
-def delete_session(session_id: str):
+async def delete_session(session_id: str):
     """Delete a chat session."""
-    if session_id in _sessions:
+    redis = get_redis()
+    if redis is not None:
+        await redis.delete(_session_key(session_id))
+    elif session_id in _sessions:
         del _sessions[session_id]
 
 
-def get_all_sessions() -> Dict[str, "ChatSession"]:
+async def find_session(session_id: str) -> Optional[ChatSession]:
+    """
+    Look up an existing session without creating it.
+    
+    Args:
+        session_id: Unique session identifier
+    
+    Returns:
+        ChatSession with its history loaded, or None if the session does not exist
+    """
+    redis = get_redis()
+    if redis is None:
+        return _sessions.get(session_id)
+    
+    data = await redis.get(_session_key(session_id))
+    if data is None:
+        return None
+    
+    session = ChatSession(session_id=session_id, redis=redis)
+    session.conversation_history = orjson.loads(data)
+    return session
+
+
+async def iter_sessions() -> AsyncIterator[Tuple[str, ChatSession]]:
+    """
+    Iterate over active sessions.
+    
+    Yields:
+        (session_id, ChatSession) pairs, with history loaded when using Redis
+    """
+    redis = get_redis()
+    if redis is None:
+        # Snapshot: sessions may be created or deleted while the caller awaits
+        for item in list(_sessions.items()):
+            yield item
+        return
+    
+    async for key in redis.scan_iter(match=f"{SESSION_KEY_PREFIX}*"):
+        session_id = key[len(SESSION_KEY_PREFIX):]
+        session = ChatSession(session_id=session_id, redis=redis)
+        await session._load_history()
+        yield session_id, session
+
+
+async def get_all_sessions() -> Dict[str, "ChatSession"]:
     """Get all active sessions (for admin/debugging purposes)."""
-    return _sessions.copy()
+    return {session_id: session async for session_id, session in iter_sessions()}
@@ -4,32 +4,70 @@ OpenAI LLM Client for handling all LLM interactions.
 """
 
 import os
-from typing import Optional, List, Dict, Any, AsyncIterator, Literal
-from openai import AsyncOpenAI
-from pydantic import BaseModel, Field
+import threading
+import httpx
+from functools import cached_property
+from typing import Optional, List, Dict, Any, AsyncIterator, Literal, Tuple
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Connection pool shared by every LLMClient, sized for bursts of concurrent completions
+HTTP_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+# Long completions can stream for minutes, so reads keep the SDK's 600s default
+HTTP_TIMEOUT = Timeout(600.0, connect=10.0)
+
 
 # Pydantic Models for Input/Output
 
-class Message(BaseModel):
+class _FrozenModel(BaseModel):
+    """Immutable model whose OpenAI dict form is computed once and cached."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False):
+        """Copy the model, dropping the cached OpenAI dict if fields change."""
+        copy = super().model_copy(update=update, deep=deep)
+        if update:
+            copy.__dict__.pop("openai_dict", None)
+        return copy
+
+
+class ToolCallFunction(_FrozenModel):
+    """Function name and JSON-encoded arguments of a tool call."""
+    name: str = Field(..., description="Function name")
+    arguments: str = Field(..., description="Function arguments as a JSON string")
+
+
+class ToolCall(_FrozenModel):
+    """Tool call requested by the model."""
+    id: str = Field(..., description="Tool call ID")
+    type: Literal["function"] = Field("function", description="Tool call type")
+    function: ToolCallFunction = Field(..., description="Function to call")
+
+
+class Message(_FrozenModel):
     """Message model for chat conversations."""
     role: Literal["system", "user", "assistant", "tool"] = Field(..., description="Message role")
     content: Optional[str] = Field(None, description="Message content")
-    tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool calls in this message")
+    tool_calls: Optional[List[ToolCall]] = Field(None, description="Tool calls in this message")
     tool_call_id: Optional[str] = Field(None, description="Tool call ID for tool responses")
     name: Optional[str] = Field(None, description="Tool name for tool responses")
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary format for OpenAI API."""
+        """Convert to dictionary format for OpenAI API (a copy callers may modify)."""
+        return dict(self.openai_dict)
+    
+    @cached_property
+    def openai_dict(self) -> Dict[str, Any]:
+        """Dictionary format for OpenAI API, built on first use and shared; do not modify."""
         result = {"role": self.role}
         if self.content is not None:
             result["content"] = self.content
         if self.tool_calls is not None:
-            result["tool_calls"] = self.tool_calls
+            result["tool_calls"] = [tool_call.model_dump() for tool_call in self.tool_calls]
         if self.tool_call_id is not None:
             result["tool_call_id"] = self.tool_call_id
         if self.name is not None:
@@ -37,17 +75,22 @@ class Message(BaseModel):
         return result
 
 
-class FunctionDefinition(BaseModel):
+class FunctionDefinition(_FrozenModel):
     """Function/tool definition for OpenAI function calling."""
     name: str = Field(..., description="Function name")
     description: str = Field(..., description="Function description")
     parameters: Dict[str, Any] = Field(..., description="Function parameters schema")
 
 
-class ToolDefinition(BaseModel):
+class ToolDefinition(_FrozenModel):
     """Tool definition for OpenAI function calling."""
     type: Literal["function"] = Field("function", description="Tool type")
     function: FunctionDefinition = Field(..., description="Function definition")
+    
+    @cached_property
+    def openai_dict(self) -> Dict[str, Any]:
+        """Dictionary format for OpenAI API, built on first use and shared; do not modify."""
+        return self.model_dump()
 
 
 class ChatCompletionInput(BaseModel):
@@ -62,14 +105,15 @@ class ChatCompletionInput(BaseModel):
     def to_openai_dict(self) -> Dict[str, Any]:
         """Convert to dictionary format for OpenAI API."""
         result = {
-            "messages": [msg.to_dict() for msg in self.messages],
+            # The SDK only reads these, so the cached dicts are passed without copying
+            "messages": [msg.openai_dict for msg in self.messages],
             "temperature": self.temperature,
             "stream": self.stream
         }
         if self.max_tokens is not None:
             result["max_tokens"] = self.max_tokens
         if self.tools is not None:
-            result["tools"] = [tool.model_dump() for tool in self.tools]
+            result["tools"] = [tool.openai_dict for tool in self.tools]
         if self.tool_choice is not None:
             result["tool_choice"] = self.tool_choice
         return result
@@ -79,28 +123,36 @@ class ChatCompletionResponse(BaseModel):
     """Response model for chat completion."""
     content: Optional[str] = Field(None, description="Assistant response content")
     role: str = Field("assistant", description="Message role")
-    tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool calls requested by the model")
+    tool_calls: Optional[List[ToolCall]] = Field(None, description="Tool calls requested by the model")
     finish_reason: Optional[str] = Field(None, description="Reason for completion finish")
     
     @classmethod
     def from_openai_response(cls, response: Any) -> "ChatCompletionResponse":
         """Create from OpenAI API response."""
-        message = response.choices[0].message
-        return cls(
+        choice = response.choices[0]
+        message = choice.message
+        
+        # Plain text replies are the common case; the SDK already validated them
+        if not message.tool_calls:
+            return cls.model_construct(
+                content=message.content,
+                role=message.role,
+                tool_calls=None,
+                finish_reason=choice.finish_reason
+            )
+        
+        # Build the typed tool calls directly instead of validating nested dicts
+        return cls.model_construct(
             content=message.content,
             role=message.role,
             tool_calls=[
-                {
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments
-                    }
-                }
-                for tc in (message.tool_calls or [])
-            ] if message.tool_calls else None,
-            finish_reason=response.choices[0].finish_reason
+                ToolCall(
+                    id=tc.id,
+                    function=ToolCallFunction(name=tc.function.name, arguments=tc.function.arguments)
+                )
+                for tc in message.tool_calls
+            ],
+            finish_reason=choice.finish_reason
         )
 
 
@@ -111,7 +163,8 @@ class LLMClient:
         self,
         api_key: Optional[str] = None,
         model: str = "gpt-4o-mini",
-        base_url: Optional[str] = None
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None
     ):
         """
         Initialize OpenAI LLM client.
@@ -120,6 +173,7 @@ class LLMClient:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             model: Model to use (defaults to gpt-4o-mini for cost efficiency)
             base_url: Optional base URL for custom endpoints
+            http_client: Optional HTTP client (defaults to the shared HTTP/2 pool)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -130,9 +184,46 @@ class LLMClient:
         self.model = model
         self.client = AsyncOpenAI(
             api_key=self.api_key,
-            base_url=base_url
+            base_url=base_url,
+            http_client=http_client or get_http_client()
         )
     
+    def _build_params(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        stream: bool,
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build request parameters from plain values, omitting unset options."""
+        optional = {"max_tokens": max_tokens, "tools": tools, "tool_choice": tool_choice}
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": stream,
+            **{key: value for key, value in optional.items() if value is not None},
+            **kwargs
+        }
+    
+    async def _create(self, params: Dict[str, Any]) -> Any:
+        """Send a non-streaming request to the chat completions endpoint."""
+        # SDK errors (openai.APIError and subclasses) propagate unwrapped so callers can retry by type
+        return await self.client.chat.completions.create(**params)
+    
+    async def _stream_text(self, params: Dict[str, Any]) -> AsyncIterator[str]:
+        """Send a streaming request and yield the text deltas."""
+        stream = await self.client.chat.completions.create(**params)
+        
+        async for chunk in stream:
+            # Some chunks (e.g. usage) carry no choices
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content:
+                yield content
+    
     async def chat_completion(
         self,
         input_data: ChatCompletionInput,
@@ -144,24 +235,15 @@ class LLMClient:
         Args:
             input_data: ChatCompletionInput model with all parameters
             **kwargs: Additional parameters for OpenAI API (will override input_data)
-            
+        
         Returns:
             ChatCompletionResponse model
         """
-        try:
-            # Convert input to OpenAI format
-            openai_params = input_data.to_openai_dict()
-            openai_params.update(kwargs)
-            
-            # Add model
-            openai_params["model"] = self.model
-            
-            response = await self.client.chat.completions.create(**openai_params)
-            
-            # Convert to our response model
-            return ChatCompletionResponse.from_openai_response(response)
-        except Exception as e:
-            raise Exception(f"Error calling OpenAI API: {str(e)}")
+        params = {**input_data.to_openai_dict(), **kwargs, "model": self.model}
+        response = await self._create(params)
+        
+        # Convert to our response model
+        return ChatCompletionResponse.from_openai_response(response)
     
     async def chat_completion_raw(
         self,
@@ -184,29 +266,13 @@ class LLMClient:
             tools: Optional tools in dict format
             tool_choice: Tool choice strategy
             **kwargs: Additional parameters for OpenAI API
-            
+        
         Returns:
             Raw OpenAI response or async iterator if streaming
         """
-        try:
-            params = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "stream": stream,
-                **kwargs
-            }
-            if max_tokens is not None:
-                params["max_tokens"] = max_tokens
-            if tools is not None:
-                params["tools"] = tools
-            if tool_choice is not None:
-                params["tool_choice"] = tool_choice
-            
-            response = await self.client.chat.completions.create(**params)
-            return response
-        except Exception as e:
-            raise Exception(f"Error calling OpenAI API: {str(e)}")
+        return await self._create(self._build_params(
+            messages, temperature, stream, max_tokens, tools, tool_choice, **kwargs
+        ))
     
     async def chat_completion_stream(
         self,
@@ -219,27 +285,13 @@ class LLMClient:
         Args:
             input_data: ChatCompletionInput model with all parameters
             **kwargs: Additional parameters for OpenAI API
-            
+        
         Yields:
             Chunks of text as they are generated
         """
-        try:
-            # Create input with streaming enabled
-            stream_input = input_data.model_copy()
-            stream_input.stream = True
-            
-            # Convert to OpenAI format
-            openai_params = stream_input.to_openai_dict()
-            openai_params.update(kwargs)
-            openai_params["model"] = self.model
-            
-            stream = await self.client.chat.completions.create(**openai_params)
-            
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-        except Exception as e:
-            raise Exception(f"Error streaming from OpenAI API: {str(e)}")
+        params = {**input_data.to_openai_dict(), **kwargs, "stream": True, "model": self.model}
+        async for content in self._stream_text(params):
+            yield content
     
     async def chat_completion_stream_raw(
         self,
@@ -260,32 +312,13 @@ class LLMClient:
             tools: Optional tools in dict format
             tool_choice: Tool choice strategy
             **kwargs: Additional parameters for OpenAI API
-            
+        
         Yields:
             Chunks of text as they are generated
         """
-        try:
-            params = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "stream": True,
-                **kwargs
-            }
-            if max_tokens is not None:
-                params["max_tokens"] = max_tokens
-            if tools is not None:
-                params["tools"] = tools
-            if tool_choice is not None:
-                params["tool_choice"] = tool_choice
-            
-            stream = await self.client.chat.completions.create(**params)
-            
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-        except Exception as e:
-            raise Exception(f"Error streaming from OpenAI API: {str(e)}")
+        params = self._build_params(messages, temperature, True, max_tokens, tools, tool_choice, **kwargs)
+        async for content in self._stream_text(params):
+            yield content
     
     async def chat_completion_simple(
         self,
@@ -304,39 +337,60 @@ class LLMClient:
             conversation_history: Optional previous conversation messages (as Message models)
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
-            
+        
         Returns:
             The assistant's response text
         """
+        # History is already validated, so build the request from plain dicts
         messages = []
         
         if system_message:
-            messages.append(Message(role="system", content=system_message))
+            messages.append({"role": "system", "content": system_message})
         
         if conversation_history:
-            messages.extend(conversation_history)
+            messages.extend(msg.to_dict() for msg in conversation_history)
         
-        messages.append(Message(role="user", content=user_message))
+        messages.append({"role": "user", "content": user_message})
         
-        input_data = ChatCompletionInput(
+        response = await self.chat_completion_raw(
             messages=messages,
             temperature=temperature,
-            max_tokens=max_tokens,
-            stream=False
+            max_tokens=max_tokens
         )
         
-        response = await self.chat_completion(input_data)
-        
-        return response.content or ""
+        return response.choices[0].message.content or ""
+
+
+# Shared HTTP transport for all LLM clients
+_http_client: Optional[DefaultAsyncHttpxClient] = None
+
+# Global client instances, keyed by (api_key, base_url, model)
+_clients: Dict[Tuple[Optional[str], Optional[str], str], LLMClient] = {}
+_clients_lock = threading.Lock()
 
 
-# Global client instance
-_client: Optional[LLMClient] = None
+def get_http_client() -> DefaultAsyncHttpxClient:
+    """
+    Get or create the HTTP/2 connection pool shared by all LLM clients.
+    
+    Built on the SDK's DefaultAsyncHttpxClient so its transport defaults
+    (redirect handling etc.) are kept; only HTTP/2, limits and timeout change.
+    
+    Returns:
+        Shared HTTP client
+    """
+    global _http_client
+    
+    if _http_client is None or _http_client.is_closed:
+        _http_client = DefaultAsyncHttpxClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    
+    return _http_client
 
 
 def get_llm_client(
     model: str = "gpt-4o-mini",
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None
 ) -> LLMClient:
     """
     Get or create LLM client instance.
@@ -344,14 +398,31 @@ def get_llm_client(
     Args:
         model: Model to use (defaults to gpt-4o-mini)
         api_key: Optional API key override
-        
+        base_url: Optional base URL for custom endpoints
+    
     Returns:
-        Initialized LLMClient instance
+        Initialized LLMClient instance, shared by callers with the same settings
     """
-    global _client
+    key = (api_key, base_url, model)
     
-    if _client is None:
-        _client = LLMClient(api_key=api_key, model=model)
+    client = _clients.get(key)
+    if client is None:
+        # Double-checked so threads racing on first use don't build duplicate pools
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = LLMClient(api_key=api_key, model=model, base_url=base_url)
     
-    return _client
+    return client
 
+
+async def close_llm_clients():
+    """Forget all LLM clients and close the shared HTTP transport (call at shutdown)."""
+    global _http_client
+    
+    # The clients hold no connections of their own; they all use the shared transport
+    _clients.clear()
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -5,27 +5,81 @@ MCP Client for connecting to MCP server over HTTP/SSE.
 
 import os
 import json
+import logging
+import asyncio
+import itertools
+import secrets
 import httpx
-import requests
-from typing import Optional, Dict, Any, List
-import uuid
-from sseclient import SSEClient
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Headers sent with every JSON-RPC request
+_REQUEST_HEADERS = {
+    "Accept": "text/event-stream, application/json",
+    "Content-Type": "application/json",
+    "Cache-Control": "no-cache"
+}
+
+# Maximum number of tool calls a client sends to the MCP server at once
+MAX_PARALLEL_TOOLS = 8
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Yield the data payload of each event in an SSE response.
+    
+    Args:
+        response: Streaming HTTP response with Content-Type text/event-stream
+    
+    Yields:
+        Event data, with multi-line data fields joined by newlines
+    """
+    data_lines: List[str] = []
+    async for line in response.aiter_lines():
+        if not line:
+            # Blank line ends the event
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+        elif line.startswith("data:"):
+            data = line[5:]
+            data_lines.append(data[1:] if data.startswith(" ") else data)
+    
+    if data_lines:
+        yield "\n".join(data_lines)
 
 
 class MCPClient:
     """Client for communicating with MCP server over HTTP/SSE."""
     
-    def __init__(self, server_url: str):
+    def __init__(self, server_url: str, max_parallel_tools: int = MAX_PARALLEL_TOOLS):
         """
         Initialize MCP client.
         
         Args:
             server_url: Base URL of the MCP server
+            max_parallel_tools: Maximum number of concurrent calls in call_tools_batch
         """
         self.server_url = server_url.rstrip('/')
+        # Parsed once instead of on every request
+        self._url = httpx.URL(self.server_url)
+        self._headers = httpx.Headers(_REQUEST_HEADERS)
         self.tools: List[Dict[str, Any]] = []
-        self.client = httpx.AsyncClient(timeout=60.0)
+        # HTTP/2 multiplexes concurrent tool calls over one connection, so a burst
+        # of calls pays the TCP/TLS setup once
+        self.client = httpx.AsyncClient(timeout=60.0, http2=True)
+        self.max_parallel_tools = max_parallel_tools
+        self._tool_semaphore = asyncio.Semaphore(max_parallel_tools)
         self._initialized = False
+        # Request IDs only need to be unique per client: a random prefix plus a counter
+        self._request_prefix = secrets.token_hex(4)
+        self._request_counter = itertools.count(1)
+    
+    def _next_request_id(self) -> str:
+        """Return a JSON-RPC request ID unique to this client."""
+        return f"{self._request_prefix}-{next(self._request_counter)}"
     
     async def _send_jsonrpc_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -34,13 +88,11 @@ class MCPClient:
         Args:
             method: JSON-RPC method name
             params: Method parameters
-            
+        
         Returns:
             Response from the server
         """
-        import asyncio
-        
-        request_id = str(uuid.uuid4())
+        request_id = self._next_request_id()
         request = {
             "jsonrpc": "2.0",
             "id": request_id,
@@ -48,20 +100,7 @@ class MCPClient:
             "params": params or {}
         }
         
-        # Use requests library for SSE (sseclient works with requests)
-        def _sync_request():
-            headers = {
-                "Accept": "text/event-stream, application/json",
-                "Content-Type": "application/json",
-                "Cache-Control": "no-cache"
-            }
-            response = requests.post(
-                self.server_url,
-                json=request,
-                headers=headers,
-                stream=True,
-                timeout=30
-            )
+        async with self.client.stream("POST", self._url, json=request, headers=self._headers) as response:
             response.raise_for_status()
             
             content_type = response.headers.get('Content-Type', '')
@@ -69,7 +108,7 @@ class MCPClient:
             # Check if response is JSON or SSE
             if 'application/json' in content_type:
                 # Direct JSON response
-                data = response.json()
+                data = json.loads(await response.aread())
                 if data.get("id") == request_id:
                     if "error" in data:
                         raise Exception(f"MCP Error: {data['error']}")
@@ -80,34 +119,23 @@ class MCPClient:
                     raise Exception(f"Unexpected response format: {data}")
             elif 'text/event-stream' in content_type:
                 # SSE stream response
-                client = SSEClient(response)
-                result = None
-                for event in client.events():
-                    if event.data:
-                        try:
-                            data = json.loads(event.data)
-                            # Check if this is the response for our request
-                            if data.get("id") == request_id:
-                                if "error" in data:
-                                    raise Exception(f"MCP Error: {data['error']}")
-                                result = data.get("result")
-                                break
-                            # Also check if it's a response without matching ID (might be server error)
-                            elif "error" in data and data.get("id") == "server-error":
-                                raise Exception(f"MCP Server Error: {data['error']}")
-                        except json.JSONDecodeError:
-                            continue
-                
-                if result is None:
-                    raise Exception(f"No response received for method {method}")
+                async for event_data in _iter_sse_data(response):
+                    try:
+                        data = json.loads(event_data)
+                    except json.JSONDecodeError:
+                        continue
+                    # Check if this is the response for our request
+                    if data.get("id") == request_id:
+                        if "error" in data:
+                            raise Exception(f"MCP Error: {data['error']}")
+                        return data.get("result")
+                    # Also check if it's a response without matching ID (might be server error)
+                    elif "error" in data and data.get("id") == "server-error":
+                        raise Exception(f"MCP Server Error: {data['error']}")
                 
-                return result
+                raise Exception(f"No response received for method {method}")
             else:
                 raise Exception(f"Unexpected Content-Type: {content_type}")
-        
-        # Run sync request in executor to make it async
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _sync_request)
     
     async def initialize(self):
         """Initialize connection and fetch available tools."""
@@ -115,21 +143,31 @@ class MCPClient:
             return
         
         try:
-            # List available tools from MCP server using JSON-RPC
-            result = await self._send_jsonrpc_request("tools/list")
-            
-            if isinstance(result, dict) and 'tools' in result:
-                self.tools = result['tools']
-            elif isinstance(result, list):
-                self.tools = result
-            else:
-                self.tools = []
-            
+            await self.list_tools()
             self._initialized = True
-        except Exception as e:
-            print(f"Error initializing MCP client: {e}")
+        except Exception:
+            logger.exception("Error initializing MCP client for %s", self.server_url)
             raise
     
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """
+        Fetch the available tools from the MCP server and store them on the client.
+        
+        Returns:
+            List of tool descriptions
+        """
+        # List available tools from MCP server using JSON-RPC
+        result = await self._send_jsonrpc_request("tools/list")
+        
+        if isinstance(result, dict) and 'tools' in result:
+            self.tools = result['tools']
+        elif isinstance(result, list):
+            self.tools = result
+        else:
+            self.tools = []
+        
+        return self.tools
+    
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Call an MCP tool.
@@ -137,7 +175,7 @@ class MCPClient:
         Args:
             tool_name: Name of the tool to call
             arguments: Arguments for the tool
-            
+        
         Returns:
             Tool execution result
         """
@@ -153,19 +191,33 @@ class MCPClient:
         except Exception as e:
             raise Exception(f"Error calling tool {tool_name}: {str(e)}")
     
+    async def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Call several MCP tools concurrently, at most max_parallel_tools at a time.
+        
+        Args:
+            calls: (tool name, arguments) pairs
+        
+        Returns:
+            Results in the same order as calls; a failed call yields its exception
+        """
+        async def _one(tool_name: str, arguments: Dict[str, Any]) -> Any:
+            async with self._tool_semaphore:
+                return await self.call_tool(tool_name, arguments)
+        
+        return await asyncio.gather(
+            *[_one(tool_name, arguments) for tool_name, arguments in calls],
+            return_exceptions=True
+        )
+    
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
-    
-    def __del__(self):
-        """Cleanup on deletion."""
-        if hasattr(self, 'client'):
-            # Note: This won't work for async cleanup, but helps with sync cleanup
-            pass
 
 
 # Global client instance
 _client: Optional[MCPClient] = None
+_client_lock = asyncio.Lock()
 
 
 async def get_mcp_client() -> MCPClient:
@@ -178,12 +230,25 @@ async def get_mcp_client() -> MCPClient:
     global _client
     
     if _client is None:
-        server_url = os.getenv(
-            'MCP_SERVER_URL',
-            'https://vipfapwm3x.us-east-1.awsapprunner.com/mcp'
-        )
-        _client = MCPClient(server_url)
-        await _client.initialize()
+        # Only one caller initializes; the rest wait and reuse its client
+        async with _client_lock:
+            if _client is None:
+                server_url = os.getenv(
+                    'MCP_SERVER_URL',
+                    'https://vipfapwm3x.us-east-1.awsapprunner.com/mcp'
+                )
+                client = MCPClient(server_url)
+                await client.initialize()
+                # Published only once initialized, so no caller sees a half-ready client
+                _client = client
     
     return _client
 
+
+async def close_mcp_client():
+    """Close the shared MCP client (call at shutdown)."""
+    global _client
+    
+    if _client is not None:
+        await _client.close()
+        _client = None
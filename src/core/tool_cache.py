@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Process-wide cache of the MCP tool list.
+
+The tool list changes rarely, so it is fetched and converted to OpenAI
+function definitions once, then refreshed after TOOLS_CACHE_TTL seconds.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, List, Dict, Any, FrozenSet
+from src.config import settings
+from src.core.llm_client import ToolDefinition, FunctionDefinition
+from src.core.mcp_client import get_mcp_client, MCPClient
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a failed refresh is retried; the previous snapshot is served meanwhile
+TOOLS_REFRESH_RETRY = 5.0
+
+
+class _CachedTools:
+    """Tool list snapshot for one MCP client."""
+    
+    def __init__(self, client: MCPClient, raw: List[Dict[str, Any]]):
+        self.client = client
+        self.raw = raw
+        self.formatted = _format_tools(raw)
+        # Tools the server annotates as not modifying state (MCP readOnlyHint)
+        self.read_only: FrozenSet[str] = frozenset(
+            tool["name"] for tool in raw if (tool.get("annotations") or {}).get("readOnlyHint")
+        )
+        self.expires_at = time.monotonic() + settings.TOOLS_CACHE_TTL
+
+
+# Current snapshot (None until first use or after invalidate_tools())
+_cache: Optional[_CachedTools] = None
+_lock = asyncio.Lock()
+
+
+def _format_tools(mcp_tools: List[Dict[str, Any]]) -> Optional[List[ToolDefinition]]:
+    """
+    Convert MCP tools to OpenAI function calling format using Pydantic models.
+    
+    Args:
+        mcp_tools: Tool descriptions as returned by the MCP server
+    
+    Returns:
+        List of ToolDefinition models or None if no tools
+    """
+    if not mcp_tools:
+        return None
+    
+    # Convert MCP tools to Pydantic ToolDefinition models
+    tools = []
+    for tool in mcp_tools:
+        # Extract tool information
+        tool_name = tool.get("name", "")
+        tool_desc = tool.get("description", "")
+        tool_input = tool.get("inputSchema", {})
+        
+        # Ensure the schema has the correct structure for OpenAI
+        # OpenAI requires the full JSON Schema with type: "object"
+        if tool_input and "type" not in tool_input:
+            # If no type specified, wrap it properly
+            tool_input = {
+                "type": "object",
+                "properties": tool_input.get("properties", {}),
+                "required": tool_input.get("required", [])
+            }
+        elif not tool_input:
+            # If no schema provided, use empty object schema
+            tool_input = {
+                "type": "object",
+                "properties": {}
+            }
+        
+        # Create Pydantic models
+        function_def = FunctionDefinition(
+            name=tool_name,
+            description=tool_desc,
+            parameters=tool_input
+        )
+        
+        tool_def = ToolDefinition(
+            type="function",
+            function=function_def
+        )
+        tools.append(tool_def)
+    
+    return tools if tools else None
+
+
+async def _get_snapshot(mcp: Optional[MCPClient] = None) -> _CachedTools:
+    """Return the current snapshot, fetching the tool list if missing or expired."""
+    global _cache
+    
+    if mcp is None:
+        mcp = await get_mcp_client()
+    
+    cached = _cache
+    if cached is not None and cached.client is mcp and time.monotonic() < cached.expires_at:
+        return cached
+    
+    async with _lock:
+        cached = _cache
+        if cached is None or cached.client is not mcp:
+            # New client: its tool list was fetched during initialize()
+            _cache = _CachedTools(mcp, mcp.tools)
+        elif time.monotonic() >= cached.expires_at:
+            try:
+                _cache = _CachedTools(mcp, await mcp.list_tools())
+            except Exception:
+                # A stale tool list beats failing every chat; retry the refresh later
+                logger.warning("Failed to refresh MCP tool list, keeping the cached one", exc_info=True)
+                cached.expires_at = time.monotonic() + TOOLS_REFRESH_RETRY
+        return _cache
+
+
+async def get_cached_tools(mcp: Optional[MCPClient] = None) -> Optional[List[ToolDefinition]]:
+    """
+    Get the MCP tools formatted for the LLM.
+    
+    Args:
+        mcp: MCP client to read tools from (defaults to the shared client)
+    
+    Returns:
+        List of ToolDefinition models or None if no tools
+    """
+    return (await _get_snapshot(mcp)).formatted
+
+
+async def get_cached_mcp_tools(mcp: Optional[MCPClient] = None) -> List[Dict[str, Any]]:
+    """
+    Get the raw MCP tool descriptions.
+    
+    Args:
+        mcp: MCP client to read tools from (defaults to the shared client)
+    
+    Returns:
+        Tool descriptions as returned by the MCP server
+    """
+    return (await _get_snapshot(mcp)).raw
+
+
+async def get_read_only_tools(mcp: Optional[MCPClient] = None) -> FrozenSet[str]:
+    """
+    Get the names of the tools annotated as read-only.
+    
+    Args:
+        mcp: MCP client to read tools from (defaults to the shared client)
+    
+    Returns:
+        Names of the tools whose annotations set readOnlyHint
+    """
+    return (await _get_snapshot(mcp)).read_only
+
+
+def invalidate_tools():
+    """Drop the cached snapshot so the next lookup rebuilds it."""
+    global _cache
+    _cache = None
@@ -4,7 +4,11 @@ Pydantic models for API requests and responses.
 """
 
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Longest user message accepted by the chat endpoints, in characters
+MAX_MESSAGE_LENGTH = 32_000
 
 
 class ChatRequest(BaseModel):
@@ -15,7 +19,7 @@ class ChatRequest(BaseModel):
     - First message: Omit session_id (or send null). Server will generate one and return it.
     - Subsequent messages: Include the session_id from the first response to maintain conversation context.
     """
-    message: str = Field(..., description="User message")
+    message: str = Field(..., min_length=1, max_length=MAX_MESSAGE_LENGTH, description="User message")
     session_id: Optional[str] = Field(
         None, 
         description="Session ID. If not provided, a new session will be created. "
@@ -26,6 +30,8 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     """Response model for chat endpoint."""
+    model_config = ConfigDict(frozen=True)
+    
     response: str = Field(..., description="Assistant response")
     session_id: str = Field(..., description="Session ID")
     tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool calls made during conversation")
@@ -33,6 +39,8 @@ class ChatResponse(BaseModel):
 
 class ToolInfo(BaseModel):
     """Information about an MCP tool."""
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., description="Tool name")
     description: str = Field(..., description="Tool description")
     parameters: Dict[str, Any] = Field(..., description="Tool parameters schema")
@@ -45,6 +53,8 @@ class ToolsResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """Response model for health check."""
+    model_config = ConfigDict(frozen=True)
+    
     status: str = Field(..., description="Service status")
     version: str = Field(..., description="API version")
 
@@ -60,6 +70,8 @@ class SessionInfo(BaseModel):
 
 class SuccessResponse(BaseModel):
     """Generic success response."""
+    model_config = ConfigDict(frozen=True)
+    
     status: str = Field("success", description="Response status")
     message: str = Field(..., description="Response message")
     session_id: Optional[str] = Field(None, description="Session ID if applicable")
@@ -3,38 +3,118 @@
 Chat-related API routes.
 """
 
-import json
+import asyncio
 import uuid
-from typing import Optional
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+import orjson
+from typing import Optional, AsyncIterator
+from fastapi import APIRouter, HTTPException, Query
+from sse_starlette.sse import EventSourceResponse
 
-from src.core.chat_util import get_chat_session
-from src.models import ChatRequest, ChatResponse
+from src.core.chat_util import get_chat_session, SessionBusyError
+from src.models import ChatRequest, ChatResponse, MAX_MESSAGE_LENGTH
 from src.config import settings
 
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# SSE frames are coalesced until this many bytes are buffered...
+SSE_FLUSH_BYTES = 8192
+# ...or this many seconds have passed since the first buffered frame
+SSE_FLUSH_INTERVAL = 0.025
+
+# Seconds between keep-alive pings while tool calls are running
+SSE_PING_INTERVAL = 15
+
+_END_OF_STREAM = object()
+
+# Pre-encoded SSE framing, so each frame is built from bytes without a str round trip
+_SSE_DATA = b"data: "
+_SSE_END = b"\n\n"
+
+
+async def _buffer_frames(frames: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Coalesce SSE frames into larger writes.
+    
+    Frames are read by a background task so that a pending flush can happen
+    while the producer is still waiting for the next LLM chunk.
+    
+    Args:
+        frames: Encoded SSE frames
+    
+    Yields:
+        Concatenated frames, at most SSE_FLUSH_INTERVAL after the first one arrived
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        try:
+            async for frame in frames:
+                await queue.put(frame)
+        finally:
+            await queue.put(_END_OF_STREAM)
+    
+    producer = asyncio.create_task(produce())
+    loop = asyncio.get_running_loop()
+    buffer = bytearray()
+    deadline = None
+    
+    try:
+        while True:
+            timeout = None if deadline is None else max(deadline - loop.time(), 0)
+            try:
+                frame = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+                continue
+            
+            if frame is _END_OF_STREAM:
+                break
+            
+            buffer += frame
+            if deadline is None:
+                deadline = loop.time() + SSE_FLUSH_INTERVAL
+            if len(buffer) >= SSE_FLUSH_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+        
+        if buffer:
+            yield bytes(buffer)
+        # Re-raise any error from the producer
+        await producer
+    finally:
+        producer.cancel()
+
 
 def _create_stream_response(session, user_message: str, session_id: str):
     """Helper to create streaming response."""
+    stream = session.chat_stream(
+        user_message=user_message,
+        temperature=settings.LLM_TEMPERATURE,
+        max_tokens=settings.LLM_MAX_TOKENS
+    )
+    # A sync iterator would be run in Starlette's threadpool, one thread hop per chunk
+    if not hasattr(stream, "__aiter__"):
+        raise TypeError("chat_stream must return an async iterator")
+    
     async def generate_stream():
-        async for chunk in session.chat_stream(
-            user_message=user_message,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS
-        ):
-            yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-        yield f"data: {json.dumps({'done': True, 'session_id': session_id})}\n\n"
+        try:
+            async for chunk in stream:
+                yield _SSE_DATA + orjson.dumps({"chunk": chunk}) + _SSE_END
+        except SessionBusyError as e:
+            # The response has already started, so report it in-band instead of as a 409
+            yield _SSE_DATA + orjson.dumps({"error": str(e), "session_id": session_id}) + _SSE_END
+            return
+        yield _SSE_DATA + orjson.dumps({"done": True, "session_id": session_id}) + _SSE_END
     
-    return StreamingResponse(
-        generate_stream(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+    # Frames are already encoded, so EventSourceResponse passes them through as-is
+    # and only adds keep-alive pings and the anti-buffering headers
+    return EventSourceResponse(
+        _buffer_frames(generate_stream()),
+        ping=SSE_PING_INTERVAL
     )
 
 
@@ -57,7 +137,7 @@ async def chat(request: ChatRequest):
     """
     try:
         # Generate new session ID if not provided (first message)
-        session_id = request.session_id or str(uuid.uuid4())
+        session_id = request.session_id or uuid.uuid4().hex
         session = await get_chat_session(session_id=session_id)
         
         if request.stream:
@@ -76,18 +156,23 @@ async def chat(request: ChatRequest):
             tool_calls=None
         )
     
+    except SessionBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
 
 @router.get("/stream")
-async def chat_stream(message: str, session_id: Optional[str] = None):
+async def chat_stream(
+    message: str = Query(..., min_length=1, max_length=MAX_MESSAGE_LENGTH),
+    session_id: Optional[str] = None
+):
     """
     Streaming chat endpoint (alternative to POST with stream=true).
     Uses query parameters for easier integration.
     """
     try:
-        session_id = session_id or str(uuid.uuid4())
+        session_id = session_id or uuid.uuid4().hex
         session = await get_chat_session(session_id=session_id)
         return _create_stream_response(session, message, session_id)
     
@@ -6,7 +6,7 @@ Session management API routes.
 import uuid
 from fastapi import APIRouter, HTTPException
 
-from src.core.chat_util import reset_session, delete_session, get_all_sessions
+from src.core.chat_util import reset_session, delete_session, find_session, iter_sessions
 from src.models import SessionInfo, SuccessResponse, SessionsListResponse
 
 
@@ -22,7 +22,7 @@ async def create_new_session():
     Returns:
         Session ID that can be used in subsequent chat requests.
     """
-    session_id = str(uuid.uuid4())
+    session_id = uuid.uuid4().hex
     return SuccessResponse(
         message="New session created",
         session_id=session_id
@@ -36,7 +36,7 @@ async def reset_chat_session(session_id: str):
     The session_id remains valid but the conversation history is cleared.
     """
     try:
-        reset_session(session_id)
+        await reset_session(session_id)
         return SuccessResponse(
             message=f"Session {session_id} reset",
             session_id=session_id
@@ -52,7 +52,7 @@ async def delete_chat_session(session_id: str):
     The session_id will no longer be valid after deletion.
     """
     try:
-        delete_session(session_id)
+        await delete_session(session_id)
         return SuccessResponse(
             message=f"Session {session_id} deleted",
             session_id=session_id
@@ -68,11 +68,10 @@ async def get_session_info(session_id: str):
     Useful for debugging or displaying conversation history.
     """
     try:
-        sessions = get_all_sessions()
-        if session_id not in sessions:
+        session = await find_session(session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
-        session = sessions[session_id]
         history = session.get_history()
         auth_state = session.get_auth_state()
         
@@ -97,15 +96,13 @@ async def list_sessions():
     Returns summary information about each session.
     """
     try:
-        all_sessions = get_all_sessions()
         sessions = []
-        for session_id, session in all_sessions.items():
-            history = session.get_history()
+        async for session_id, session in iter_sessions():
             auth_state = session.get_auth_state()
             sessions.append({
                 "session_id": session_id,
-                "message_count": len(history),
-                "last_message": history[-1] if history else None,
+                "message_count": session.message_count,
+                "last_message": session.last_message(),
                 "is_authenticated": auth_state["is_authenticated"],
                 "customer_name": auth_state["customer_info"].get("name") if auth_state["customer_info"] else None
             })
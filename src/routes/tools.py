@@ -5,7 +5,7 @@ Tools-related API routes.
 
 from fastapi import APIRouter, HTTPException
 
-from src.core.mcp_client import get_mcp_client
+from src.core.tool_cache import get_cached_mcp_tools
 from src.models import ToolInfo, ToolsResponse
 
 
@@ -18,15 +18,13 @@ async def get_tools():
     Get list of available MCP tools.
     """
     try:
-        mcp = await get_mcp_client()
-        
         tools = [
             ToolInfo(
                 name=tool.get("name", ""),
                 description=tool.get("description", ""),
                 parameters=tool.get("inputSchema", {})
             )
-            for tool in mcp.tools
+            for tool in await get_cached_mcp_tools()
         ]
         
         return ToolsResponse(tools=tools)
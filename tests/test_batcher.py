@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batcher.py
+"""
+
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from src.core import batcher as batcher_module
+from src.core.batcher import LLMBatcher, get_llm_batcher, close_llm_batchers
+from src.core.llm_client import ChatCompletionInput, ChatCompletionResponse, Message
+
+
+def _input(content: str) -> ChatCompletionInput:
+    """Build a single-message completion input."""
+    return ChatCompletionInput(messages=[Message(role="user", content=content)])
+
+
+class TestLLMBatcher:
+    """Test suite for LLMBatcher class."""
+    
+    @pytest.fixture
+    def mock_llm_client(self):
+        """Fixture providing a mocked LLM client that echoes the last message."""
+        mock_client = AsyncMock()
+        
+        async def chat_completion(input_data):
+            return ChatCompletionResponse(content=input_data.messages[-1].content)
+        
+        mock_client.chat_completion = AsyncMock(side_effect=chat_completion)
+        return mock_client
+    
+    @pytest.mark.asyncio
+    async def test_submit_returns_matching_responses(self, mock_llm_client):
+        """Test each concurrent submitter gets its own response."""
+        batcher = LLMBatcher(mock_llm_client)
+        
+        responses = await asyncio.gather(*[batcher.submit(_input(str(i))) for i in range(5)])
+        
+        assert [r.content for r in responses] == ["0", "1", "2", "3", "4"]
+        assert mock_llm_client.chat_completion.call_count == 5
+        await batcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_requests_within_window_are_batched(self, mock_llm_client):
+        """Test requests arriving within the window are dispatched together."""
+        batcher = LLMBatcher(mock_llm_client, batch_window_ms=50)
+        dispatched = []
+        original_dispatch = batcher._dispatch
+        
+        async def record_dispatch(batch):
+            dispatched.append(len(batch))
+            await original_dispatch(batch)
+        
+        batcher._dispatch = record_dispatch
+        
+        await asyncio.gather(*[batcher.submit(_input("hi")) for _ in range(3)])
+        
+        assert dispatched == [3]
+        await batcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_batch_size_limit(self, mock_llm_client):
+        """Test batches never exceed batch_size."""
+        batcher = LLMBatcher(mock_llm_client, batch_size=2, batch_window_ms=50)
+        dispatched = []
+        original_dispatch = batcher._dispatch
+        
+        async def record_dispatch(batch):
+            dispatched.append(len(batch))
+            await original_dispatch(batch)
+        
+        batcher._dispatch = record_dispatch
+        
+        await asyncio.gather(*[batcher.submit(_input("hi")) for _ in range(5)])
+        
+        assert dispatched == [2, 2, 1]
+        await batcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_error_is_routed_to_submitter(self, mock_llm_client):
+        """Test a failing request raises only for its own submitter."""
+        async def chat_completion(input_data):
+            if input_data.messages[-1].content == "bad":
+                raise Exception("API Error")
+            return ChatCompletionResponse(content="ok")
+        
+        mock_llm_client.chat_completion = AsyncMock(side_effect=chat_completion)
+        batcher = LLMBatcher(mock_llm_client)
+        
+        results = await asyncio.gather(
+            batcher.submit(_input("good")),
+            batcher.submit(_input("bad")),
+            return_exceptions=True
+        )
+        
+        assert results[0].content == "ok"
+        assert isinstance(results[1], Exception)
+        assert str(results[1]) == "API Error"
+        await batcher.close()
+
+
+class TestGetLLMBatcher:
+    """Test suite for get_llm_batcher function."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_batchers(self, monkeypatch):
+        """Start every test with an empty batcher registry."""
+        monkeypatch.setattr(batcher_module, "_batchers", {})
+    
+    def test_one_batcher_per_client(self):
+        """Test that the same client always maps to the same batcher."""
+        client1 = AsyncMock()
+        client2 = AsyncMock()
+        
+        assert get_llm_batcher(client1) is get_llm_batcher(client1)
+        assert get_llm_batcher(client1) is not get_llm_batcher(client2)
+        assert get_llm_batcher(client1).client is client1
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("delay", [0, 0.01], ids=["queued", "in_window"])
+    async def test_close_llm_batchers(self, delay):
+        """Test closing stops every worker, answers waiting requests and clears the registry."""
+        client = AsyncMock()
+        client.chat_completion = AsyncMock(return_value=ChatCompletionResponse(content="ok"))
+        batcher = get_llm_batcher(client)
+        batcher.batch_window = 60
+        
+        # Close before the worker picks the request up, or while it waits out the window
+        pending = asyncio.ensure_future(batcher.submit(_input("waiting")))
+        await asyncio.sleep(delay)
+        worker = batcher._worker
+        await close_llm_batchers()
+        
+        assert worker.done()
+        assert (await asyncio.wait_for(pending, timeout=1)).content == "ok"
+        assert batcher_module._batchers == {}
@@ -4,34 +4,131 @@ Unit tests for chat_util.py
 """
 
 import pytest
+import asyncio
+import inspect
 import json
-from unittest.mock import AsyncMock, MagicMock, patch, Mock
+import orjson
+from typing import Optional, List, Any
+from unittest.mock import AsyncMock, MagicMock, patch
+from redis.exceptions import LockNotOwnedError
 from src.core.chat_util import (
     ChatSession,
+    SessionBusyError,
     get_chat_session,
     reset_session,
     delete_session,
-    get_all_sessions
+    get_all_sessions,
+    iter_sessions,
+    find_session
+)
+from src.core.llm_client import (
+    Message,
+    ChatCompletionResponse,
+    ToolCall,
+    ToolCallFunction,
+    ToolDefinition
 )
-from src.core.llm_client import Message, ChatCompletionResponse, ToolDefinition, FunctionDefinition
 from src.core.mcp_client import MCPClient
+from src.core.batcher import LLMBatcher
+from src.core import chat_util
 
 
-class TestChatSession:
-    """Test suite for ChatSession class."""
+# Tool arguments used across tests, and their JSON form as sent by the LLM
+TOOL_ARGS = {"param": "value"}
+TOOL_ARGS_JSON = json.dumps(TOOL_ARGS)
+
+# Tool description the MCP server annotates as not modifying state
+READ_ONLY_TOOL = {"name": "tool_a", "annotations": {"readOnlyHint": True}}
+
+
+class FakeMCPClient:
+    """Minimal stand-in for MCPClient (cheaper to build than AsyncMock(spec=MCPClient))."""
     
-    @pytest.fixture
-    def mock_llm_client(self):
-        """Fixture providing a mocked LLM client."""
-        mock_client = AsyncMock()
-        return mock_client
+    def __init__(self):
+        self.tools = []
+        self.call_tool = AsyncMock()
     
-    @pytest.fixture
-    def mock_mcp_client(self):
-        """Fixture providing a mocked MCP client."""
-        mock_client = AsyncMock(spec=MCPClient)
-        mock_client.tools = []
-        return mock_client
+    async def call_tools_batch(self, calls):
+        return await asyncio.gather(
+            *[self.call_tool(name, arguments) for name, arguments in calls],
+            return_exceptions=True
+        )
+
+
+def tool_call(call_id: str, name: str, arguments: str) -> ToolCall:
+    """Build a ToolCall as parsed from an LLM response."""
+    return ToolCall(id=call_id, function=ToolCallFunction(name=name, arguments=arguments))
+
+
+def stop_response(content: Optional[str]) -> ChatCompletionResponse:
+    """Build a final (non tool-calling) LLM response."""
+    # Inputs are known-valid, so skip validation
+    return ChatCompletionResponse.model_construct(
+        content=content, role="assistant", tool_calls=None, finish_reason="stop"
+    )
+
+
+def tool_calls_response(*tool_calls: ToolCall, content: Optional[str] = None) -> ChatCompletionResponse:
+    """Build an LLM response that requests the given tool calls."""
+    return ChatCompletionResponse.model_construct(
+        content=content, role="assistant", tool_calls=list(tool_calls), finish_reason="tool_calls"
+    )
+
+
+def async_return(value: Any):
+    """
+    Build a coroutine function that records its calls and returns a fixed value.
+    
+    Cheaper than AsyncMock for stubs whose calls are only counted, never asserted on.
+    """
+    async def stub(*args, **kwargs):
+        stub.calls.append((args, kwargs))
+        return value
+    stub.calls = []
+    return stub
+
+
+def async_sequence(*values: Any):
+    """Like async_return, but returns the given values one per call, in order."""
+    remaining = iter(values)
+    
+    async def stub(*args, **kwargs):
+        stub.calls.append((args, kwargs))
+        return next(remaining)
+    stub.calls = []
+    return stub
+
+
+def mock_stream(chunks: List[str]):
+    """Build a chat_completion_stream replacement that yields the given chunks."""
+    async def stream(input_data):
+        for chunk in chunks:
+            yield chunk
+    return stream
+
+
+@pytest.fixture(autouse=True)
+def no_batch_window(monkeypatch):
+    """Dispatch LLM requests immediately instead of waiting out the batching window."""
+    monkeypatch.setattr(
+        chat_util, "get_llm_batcher", lambda client: LLMBatcher(client, batch_window_ms=0)
+    )
+
+
+@pytest.fixture
+def mock_llm_client():
+    """Fixture providing a mocked LLM client."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_mcp_client():
+    """Fixture providing a fake MCP client."""
+    return FakeMCPClient()
+
+
+class TestChatSession:
+    """Test suite for ChatSession class."""
     
     def test_init_with_defaults(self):
         """Test ChatSession initialization with defaults."""
@@ -43,7 +140,6 @@ class TestChatSession:
         assert "customer support" in session.system_message.lower()
         assert session.llm_client is not None
         assert session.mcp_client is None
-        assert session._mcp_tools_formatted is None
     
     def test_init_with_custom_system_message(self):
         """Test ChatSession initialization with custom system message."""
@@ -69,13 +165,22 @@ class TestChatSession:
     def test_default_system_message(self):
         """Test that default system message contains expected content."""
         session = ChatSession(session_id="test-123")
-        message = session._default_system_message()
+        message = session.system_message
         
         assert isinstance(message, str)
         assert len(message) > 0
         assert "customer support" in message.lower()
         assert "tools" in message.lower()
     
+    def test_default_system_message_shared(self):
+        """Test that sessions with the default prompt share one system Message."""
+        session1 = ChatSession(session_id="session-1")
+        session2 = ChatSession(session_id="session-2")
+        custom = ChatSession(session_id="session-3", system_message="Custom prompt")
+        
+        assert session1._build_messages()[0] is session2._build_messages()[0]
+        assert custom._build_messages()[0].content == "Custom prompt"
+    
     @pytest.mark.asyncio
     async def test_get_mcp_client_with_existing(self, mock_mcp_client):
         """Test _get_mcp_client with existing client."""
@@ -90,7 +195,7 @@ class TestChatSession:
     @pytest.mark.asyncio
     async def test_get_mcp_client_creates_new(self):
         """Test _get_mcp_client creates new client when None."""
-        with patch('chat_util.get_mcp_client') as mock_get_mcp:
+        with patch('src.core.chat_util.get_mcp_client') as mock_get_mcp:
             mock_client = AsyncMock(spec=MCPClient)
             mock_get_mcp.return_value = mock_client
             
@@ -162,9 +267,25 @@ class TestChatSession:
         
         assert result1 is result2  # Should be the same cached object
     
+    @pytest.mark.asyncio
+    async def test_get_tools_for_llm_shared_across_sessions(self, mock_mcp_client):
+        """Test that sessions using the same MCP client share formatted tools."""
+        mock_mcp_client.tools = [
+            {
+                "name": "test_tool",
+                "description": "A test tool",
+                "inputSchema": {"properties": {}}
+            }
+        ]
+        
+        session1 = ChatSession(session_id="session-1", mcp_client=mock_mcp_client)
+        session2 = ChatSession(session_id="session-2", mcp_client=mock_mcp_client)
+        
+        assert await session1._get_tools_for_llm() is await session2._get_tools_for_llm()
+    
     @pytest.mark.asyncio
     async def test_execute_tool_call_success_dict(self, mock_mcp_client):
-        """Test _execute_tool_call with dict result."""
+        """Test _execute_tool_calls with dict result."""
         mock_mcp_client.call_tool = AsyncMock(return_value={"result": "success"})
         
         session = ChatSession(
@@ -172,30 +293,34 @@ class TestChatSession:
             mcp_client=mock_mcp_client
         )
         
-        result = await session._execute_tool_call("test_tool", {"param": "value"})
+        [message] = await session._execute_tool_calls([tool_call("call_1", "test_tool", TOOL_ARGS_JSON)])
+        result = message.content
         
-        assert isinstance(result, str)
-        parsed = json.loads(result)
+        assert message.role == "tool"
+        assert message.tool_call_id == "call_1"
+        assert message.name == "test_tool"
+        assert result == '{"result":"success"}'  # Compact, no indentation
+        parsed = orjson.loads(result)
         assert parsed["result"] == "success"
-        mock_mcp_client.call_tool.assert_called_once_with("test_tool", {"param": "value"})
+        mock_mcp_client.call_tool.assert_called_once_with("test_tool", TOOL_ARGS)
     
     @pytest.mark.asyncio
     async def test_execute_tool_call_success_string(self, mock_mcp_client):
-        """Test _execute_tool_call with string result."""
-        mock_mcp_client.call_tool = AsyncMock(return_value="simple string result")
+        """Test _execute_tool_calls with string result."""
+        mock_mcp_client.call_tool = async_return("simple string result")
         
         session = ChatSession(
             session_id="test-123",
             mcp_client=mock_mcp_client
         )
         
-        result = await session._execute_tool_call("test_tool", {})
+        [message] = await session._execute_tool_calls([tool_call("call_1", "test_tool", "{}")])
         
-        assert result == "simple string result"
+        assert message.content == "simple string result"
     
     @pytest.mark.asyncio
     async def test_execute_tool_call_error_handling(self, mock_mcp_client):
-        """Test _execute_tool_call error handling."""
+        """Test _execute_tool_calls error handling."""
         mock_mcp_client.call_tool = AsyncMock(side_effect=Exception("Tool error"))
         
         session = ChatSession(
@@ -203,27 +328,22 @@ class TestChatSession:
             mcp_client=mock_mcp_client
         )
         
-        result = await session._execute_tool_call("test_tool", {})
+        [message] = await session._execute_tool_calls([tool_call("call_1", "test_tool", "{}")])
         
-        assert isinstance(result, str)
-        parsed = json.loads(result)
+        parsed = orjson.loads(message.content)
         assert "error" in parsed
         assert "Tool execution failed" in parsed["error"]
     
     @pytest.mark.asyncio
-    async def test_chat_simple_no_tools(self, mock_llm_client):
+    async def test_chat_simple_no_tools(self, mock_llm_client, mock_mcp_client):
         """Test chat method without tool calls."""
-        mock_response = ChatCompletionResponse(
-            content="Hello! How can I help you?",
-            role="assistant",
-            tool_calls=None,
-            finish_reason="stop"
-        )
-        mock_llm_client.chat_completion = AsyncMock(return_value=mock_response)
+        mock_response = stop_response("Hello! How can I help you?")
+        mock_llm_client.chat_completion = async_return(mock_response)
         
         session = ChatSession(
             session_id="test-123",
-            llm_client=mock_llm_client
+            llm_client=mock_llm_client,
+            mcp_client=mock_mcp_client
         )
         
         response = await session.chat("Hello")
@@ -238,29 +358,10 @@ class TestChatSession:
     async def test_chat_with_tool_calls(self, mock_llm_client, mock_mcp_client):
         """Test chat method with tool calls."""
         # First response: wants to call a tool
-        tool_response = ChatCompletionResponse(
-            content=None,
-            role="assistant",
-            tool_calls=[
-                {
-                    "id": "call_123",
-                    "type": "function",
-                    "function": {
-                        "name": "test_tool",
-                        "arguments": json.dumps({"param": "value"})
-                    }
-                }
-            ],
-            finish_reason="tool_calls"
-        )
+        tool_response = tool_calls_response(tool_call("call_123", "test_tool", TOOL_ARGS_JSON))
         
         # Second response: final answer
-        final_response = ChatCompletionResponse(
-            content="Here's the result: success",
-            role="assistant",
-            tool_calls=None,
-            finish_reason="stop"
-        )
+        final_response = stop_response("Here's the result: success")
         
         mock_llm_client.chat_completion = AsyncMock(side_effect=[tool_response, final_response])
         mock_mcp_client.call_tool = AsyncMock(return_value={"result": "success"})
@@ -276,30 +377,159 @@ class TestChatSession:
         
         assert response == "Here's the result: success"
         assert mock_llm_client.chat_completion.call_count == 2
-        mock_mcp_client.call_tool.assert_called_once_with("test_tool", {"param": "value"})
+        mock_mcp_client.call_tool.assert_called_once_with("test_tool", TOOL_ARGS)
+        
+        # Each iteration sees its own snapshot of the growing message list
+        first_input = mock_llm_client.chat_completion.call_args_list[0][0][0]
+        second_input = mock_llm_client.chat_completion.call_args_list[1][0][0]
+        assert len(first_input.messages) == 2
+        assert len(second_input.messages) == 4
+        assert second_input.temperature == first_input.temperature
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_calls_runs_concurrently(self, mock_mcp_client):
+        """Test that tool calls from one assistant message run concurrently."""
+        started = []
+        release = asyncio.Event()
+        
+        async def call_tool(name, arguments):
+            started.append(name)
+            if len(started) == 2:
+                release.set()
+            await release.wait()
+            return {"tool": name}
+        
+        mock_mcp_client.call_tool = call_tool
+        session = ChatSession(session_id="test-123", mcp_client=mock_mcp_client)
+        
+        results = await asyncio.wait_for(session._execute_tool_calls([
+            tool_call("call_1", "tool_a", "{}"),
+            tool_call("call_2", "tool_b", "{}")
+        ]), timeout=1)
+        
+        assert [r.tool_call_id for r in results] == ["call_1", "call_2"]
+        assert [json.loads(r.content)["tool"] for r in results] == ["tool_a", "tool_b"]
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_calls_deduplicates_within_turn(self, mock_mcp_client):
+        """Test identical read-only tool calls in a turn are executed only once."""
+        mock_mcp_client.tools = [READ_ONLY_TOOL]
+        mock_mcp_client.call_tool = AsyncMock(return_value={"result": "success"})
+        session = ChatSession(session_id="test-123", mcp_client=mock_mcp_client)
+        turn_cache = {}
+        
+        results = await session._execute_tool_calls([
+            tool_call("call_1", "tool_a", '{"a": 1, "b": 2}'),
+            tool_call("call_2", "tool_a", '{"b": 2, "a": 1}')
+        ], turn_cache)
+        later = await session._execute_tool_calls([
+            tool_call("call_3", "tool_a", '{"a": 1, "b": 2}')
+        ], turn_cache)
+        
+        mock_mcp_client.call_tool.assert_called_once_with("tool_a", {"a": 1, "b": 2})
+        assert [r.tool_call_id for r in results + later] == ["call_1", "call_2", "call_3"]
+        assert results[0].content == results[1].content == later[0].content
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_calls_repeats_writes_across_iterations(self, mock_mcp_client):
+        """Test a tool not marked read-only runs again when called in a later iteration."""
+        mock_mcp_client.call_tool = AsyncMock(side_effect=[{"order": 1}, {"order": 2}])
+        session = ChatSession(session_id="test-123", mcp_client=mock_mcp_client)
+        turn_cache = {}
+        
+        first = await session._execute_tool_calls([tool_call("call_1", "create_order", "{}")], turn_cache)
+        second = await session._execute_tool_calls([tool_call("call_2", "create_order", "{}")], turn_cache)
+        
+        assert mock_mcp_client.call_tool.call_count == 2
+        assert [json.loads(r.content)["order"] for r in first + second] == [1, 2]
+        assert turn_cache == {}
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_calls_runs_identical_writes_separately(self, mock_mcp_client):
+        """Test identical calls to a tool not marked read-only each run and get their own result."""
+        mock_mcp_client.call_tool = AsyncMock(side_effect=[{"order": 1}, {"order": 2}])
+        session = ChatSession(session_id="test-123", mcp_client=mock_mcp_client)
+        
+        results = await session._execute_tool_calls([
+            tool_call("call_1", "create_order", "{}"),
+            tool_call("call_2", "create_order", "{}")
+        ])
+        
+        assert mock_mcp_client.call_tool.call_count == 2
+        assert [r.tool_call_id for r in results] == ["call_1", "call_2"]
+        assert sorted(json.loads(r.content)["order"] for r in results) == [1, 2]
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_calls_retries_failed_reads(self, mock_mcp_client):
+        """Test a failed read-only call is not cached and runs again in a later iteration."""
+        mock_mcp_client.tools = [READ_ONLY_TOOL]
+        mock_mcp_client.call_tool = AsyncMock(side_effect=[Exception("Tool error"), {"stock": 5}])
+        session = ChatSession(session_id="test-123", mcp_client=mock_mcp_client)
+        turn_cache = {}
+        
+        first = await session._execute_tool_calls([tool_call("call_1", "tool_a", "{}")], turn_cache)
+        second = await session._execute_tool_calls([tool_call("call_2", "tool_a", "{}")], turn_cache)
+        
+        assert "Tool error" in json.loads(first[0].content)["error"]
+        assert json.loads(second[0].content) == {"stock": 5}
+        assert mock_mcp_client.call_tool.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_calls_write_invalidates_cached_reads(self, mock_mcp_client):
+        """Test a write clears cached read-only results so later reads see fresh data."""
+        mock_mcp_client.tools = [READ_ONLY_TOOL]
+        mock_mcp_client.call_tool = AsyncMock(side_effect=[{"stock": 5}, {"order": 1}, {"stock": 4}])
+        session = ChatSession(session_id="test-123", mcp_client=mock_mcp_client)
+        turn_cache = {}
+        
+        before = await session._execute_tool_calls([tool_call("call_1", "tool_a", "{}")], turn_cache)
+        await session._execute_tool_calls([tool_call("call_2", "create_order", "{}")], turn_cache)
+        after = await session._execute_tool_calls([tool_call("call_3", "tool_a", "{}")], turn_cache)
+        
+        assert json.loads(before[0].content) == {"stock": 5}
+        assert json.loads(after[0].content) == {"stock": 4}
+        assert mock_mcp_client.call_tool.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_chats_are_serialized(self, mock_llm_client, mock_mcp_client):
+        """Test overlapping chat() calls on one session do not interleave."""
+        in_flight = []
+        
+        async def chat_completion(input_data):
+            in_flight.append(input_data)
+            assert len(in_flight) == 1
+            await asyncio.sleep(0)
+            in_flight.pop()
+            return stop_response("ok")
+        
+        mock_llm_client.chat_completion = chat_completion
+        session = ChatSession(
+            session_id="test-123",
+            llm_client=mock_llm_client,
+            mcp_client=mock_mcp_client
+        )
+        
+        await asyncio.gather(session.chat("First"), session.chat("Second"))
+        
+        assert [m["content"] for m in session.conversation_history] == ["First", "ok", "Second", "ok"]
+    
+    def test_sessions_share_lock_per_session_id(self):
+        """Test ChatSession instances for one session ID share a turn lock."""
+        first = ChatSession(session_id="test-123")
+        second = ChatSession(session_id="test-123")
+        other = ChatSession(session_id="other")
+        
+        assert first._lock is second._lock
+        assert first._lock is not other._lock
     
     @pytest.mark.asyncio
     async def test_chat_max_iterations(self, mock_llm_client, mock_mcp_client):
         """Test chat method respects max_tool_iterations."""
         # Always return tool calls
-        tool_response = ChatCompletionResponse(
-            content="Processing...",
-            role="assistant",
-            tool_calls=[
-                {
-                    "id": "call_123",
-                    "type": "function",
-                    "function": {
-                        "name": "test_tool",
-                        "arguments": "{}"
-                    }
-                }
-            ],
-            finish_reason="tool_calls"
-        )
+        tool_response = tool_calls_response(tool_call("call_123", "test_tool", "{}"), content="Processing...")
         
         mock_llm_client.chat_completion = AsyncMock(return_value=tool_response)
-        mock_mcp_client.call_tool = AsyncMock(return_value={"result": "ok"})
+        mock_mcp_client.call_tool = async_return({"result": "ok"})
         mock_mcp_client.tools = []
         
         session = ChatSession(
@@ -317,77 +547,24 @@ class TestChatSession:
         assert isinstance(response, str)
     
     @pytest.mark.asyncio
-    async def test_chat_stream_no_tools(self, mock_llm_client):
-        """Test chat_stream method without tool calls."""
-        mock_response = ChatCompletionResponse(
-            content="Streaming response",
-            role="assistant",
-            tool_calls=None,
-            finish_reason="stop"
-        )
-        mock_llm_client.chat_completion = AsyncMock(return_value=mock_response)
-        
-        async def mock_stream(input_data):
-            chunks = ["Hello", " ", "World"]
-            for chunk in chunks:
-                yield chunk
-        
-        # Return the async generator function directly
-        mock_llm_client.chat_completion_stream = mock_stream
-        
-        session = ChatSession(
-            session_id="test-123",
-            llm_client=mock_llm_client
-        )
-        
-        chunks = []
-        async for chunk in session.chat_stream("Hello"):
-            chunks.append(chunk)
-        
-        assert chunks == ["Hello", " ", "World"]
-        assert len(session.conversation_history) == 2
-        assert session.conversation_history[-1]["content"] == "Hello World"
-    
-    @pytest.mark.asyncio
-    async def test_chat_stream_with_tools(self, mock_llm_client, mock_mcp_client):
-        """Test chat_stream method with tool calls."""
-        # First response: wants to call a tool
-        tool_response = ChatCompletionResponse(
-            content=None,
-            role="assistant",
-            tool_calls=[
-                {
-                    "id": "call_123",
-                    "type": "function",
-                    "function": {
-                        "name": "test_tool",
-                        "arguments": "{}"
-                    }
-                }
+    @pytest.mark.parametrize("responses, user_message, expected_chunks", [
+        # No tool calls: stream straight away
+        ([stop_response("Streaming response")], "Hello", ["Hello", " ", "World"]),
+        # One round of tool calls, then stream the final answer
+        (
+            [
+                tool_calls_response(tool_call("call_123", "test_tool", "{}")),
+                stop_response(None)
             ],
-            finish_reason="tool_calls"
-        )
-        
-        # Second response: no more tool calls, ready to stream
-        no_tool_response = ChatCompletionResponse(
-            content=None,
-            role="assistant",
-            tool_calls=None,
-            finish_reason="stop"
+            "Use tool",
+            ["Result", " ", "here"]
         )
-        
-        # First call returns tool response, second call (after tool execution) returns no tools
-        mock_llm_client.chat_completion = AsyncMock(side_effect=[tool_response, no_tool_response])
-        
-        async def mock_stream(input_data):
-            chunks = ["Result", " ", "here"]
-            for chunk in chunks:
-                yield chunk
-        
-        # Return the async generator function directly
-        mock_llm_client.chat_completion_stream = mock_stream
-        mock_mcp_client.call_tool = AsyncMock(return_value={"result": "ok"})
-        mock_mcp_client.tools = []
+    ], ids=["no_tools", "with_tools"])
+    async def test_chat_stream(self, mock_llm_client, mock_mcp_client, responses, user_message, expected_chunks):
+        """Test chat_stream method with and without tool calls."""
+        mock_llm_client.chat_completion = async_sequence(*responses)
+        mock_llm_client.chat_completion_stream = mock_stream(expected_chunks)
+        mock_mcp_client.call_tool = async_return({"result": "ok"})
         
         session = ChatSession(
             session_id="test-123",
@@ -396,13 +573,19 @@ class TestChatSession:
         )
         
         chunks = []
-        async for chunk in session.chat_stream("Use tool"):
+        async for chunk in session.chat_stream(user_message):
             chunks.append(chunk)
         
-        assert chunks == ["Result", " ", "here"]
-        # Should call chat_completion twice: once for tool call, once to check if more tools needed
-        assert mock_llm_client.chat_completion.call_count == 2
-        assert mock_mcp_client.call_tool.called
+        assert chunks == expected_chunks
+        # One completion per tool round, plus the one that decides to stream
+        assert len(mock_llm_client.chat_completion.calls) == len(responses)
+        assert bool(mock_mcp_client.call_tool.calls) == (len(responses) > 1)
+        assert session.conversation_history[0]["content"] == user_message
+        assert session.conversation_history[-1]["content"] == "".join(expected_chunks)
+    
+    def test_chat_stream_is_async_generator(self):
+        """Test chat_stream is a native async generator (no threadpool offload)."""
+        assert inspect.isasyncgenfunction(ChatSession.chat_stream)
     
     def test_reset(self):
         """Test reset method clears conversation history."""
@@ -430,99 +613,102 @@ class TestChatSession:
         # Modifying the copy shouldn't affect original
         history.append({"role": "assistant", "content": "Hi"})
         assert len(session.conversation_history) == 1
+    
+    def test_history_is_bounded(self):
+        """Test conversation history keeps only the last MAX_HISTORY messages."""
+        with patch('src.core.chat_util.settings.MAX_HISTORY', 3):
+            session = ChatSession(session_id="test-123")
+            session.conversation_history = [
+                {"role": "user", "content": str(i)} for i in range(5)
+            ]
+            session._messages.append(Message(role="assistant", content="5"))
+        
+        assert [m["content"] for m in session.get_history()] == ["3", "4", "5"]
 
 
 class TestSessionManagement:
     """Test suite for global session management functions."""
     
     @pytest.fixture(autouse=True)
-    def reset_sessions(self):
-        """Reset sessions before each test."""
-        import chat_util
-        chat_util._sessions = {}
-        yield
-        chat_util._sessions = {}
+    def reset_sessions(self, monkeypatch):
+        """Give each test an empty session registry (restored afterwards by monkeypatch)."""
+        monkeypatch.setattr(chat_util, "_sessions", {})
+    
+    @pytest.fixture
+    def mock_session_class(self, monkeypatch):
+        """Fixture replacing ChatSession with a mock class for the test."""
+        mock_class = MagicMock()
+        mock_class.return_value = MagicMock()
+        monkeypatch.setattr(chat_util, "ChatSession", mock_class)
+        return mock_class
     
     @pytest.mark.asyncio
-    async def test_get_chat_session_creates_new(self):
+    async def test_get_chat_session_creates_new(self, mock_session_class):
         """Test get_chat_session creates a new session."""
-        with patch('chat_util.ChatSession') as mock_session_class:
-            mock_session = MagicMock()
-            mock_session_class.return_value = mock_session
-            
-            session = await get_chat_session("new-session")
-            
-            assert session is mock_session
-            mock_session_class.assert_called_once_with(
-                session_id="new-session",
-                system_message=None
-            )
+        session = await get_chat_session("new-session")
+        
+        assert session is mock_session_class.return_value
+        mock_session_class.assert_called_once_with(
+            session_id="new-session",
+            system_message=None
+        )
     
     @pytest.mark.asyncio
-    async def test_get_chat_session_returns_existing(self):
+    async def test_get_chat_session_returns_existing(self, mock_session_class):
         """Test get_chat_session returns existing session."""
-        with patch('chat_util.ChatSession') as mock_session_class:
-            mock_session = MagicMock()
-            mock_session_class.return_value = mock_session
-            
-            session1 = await get_chat_session("existing-session")
-            session2 = await get_chat_session("existing-session")
-            
-            assert session1 is session2
-            assert mock_session_class.call_count == 1  # Only created once
+        session1 = await get_chat_session("existing-session")
+        session2 = await get_chat_session("existing-session")
+        
+        assert session1 is session2
+        assert mock_session_class.call_count == 1  # Only created once
     
     @pytest.mark.asyncio
-    async def test_get_chat_session_with_system_message(self):
+    async def test_get_chat_session_with_system_message(self, mock_session_class):
         """Test get_chat_session with custom system message."""
-        with patch('chat_util.ChatSession') as mock_session_class:
-            mock_session = MagicMock()
-            mock_session_class.return_value = mock_session
-            
-            await get_chat_session("test-session", system_message="Custom message")
-            
-            mock_session_class.assert_called_once_with(
-                session_id="test-session",
-                system_message="Custom message"
-            )
+        await get_chat_session("test-session", system_message="Custom message")
+        
+        mock_session_class.assert_called_once_with(
+            session_id="test-session",
+            system_message="Custom message"
+        )
     
-    def test_reset_session_exists(self):
+    @pytest.mark.asyncio
+    async def test_reset_session_exists(self):
         """Test reset_session with existing session."""
-        import chat_util
-        
         # Create a session
         session = ChatSession(session_id="test-123")
         session.conversation_history = [{"role": "user", "content": "Hello"}]
         chat_util._sessions["test-123"] = session
         
-        reset_session("test-123")
+        await reset_session("test-123")
         
         assert session.conversation_history == []
     
-    def test_reset_session_not_exists(self):
+    @pytest.mark.asyncio
+    async def test_reset_session_not_exists(self):
         """Test reset_session with non-existent session."""
         # Should not raise an error
-        reset_session("non-existent")
+        await reset_session("non-existent")
     
-    def test_delete_session_exists(self):
+    @pytest.mark.asyncio
+    async def test_delete_session_exists(self):
         """Test delete_session with existing session."""
-        import chat_util
-        
         session = ChatSession(session_id="test-123")
         chat_util._sessions["test-123"] = session
         
-        delete_session("test-123")
+        await delete_session("test-123")
         
         assert "test-123" not in chat_util._sessions
     
-    def test_delete_session_not_exists(self):
+    @pytest.mark.asyncio
+    async def test_delete_session_not_exists(self):
         """Test delete_session with non-existent session."""
         # Should not raise an error
-        delete_session("non-existent")
+        await delete_session("non-existent")
     
-    def test_get_all_sessions(self):
+    @pytest.mark.asyncio
+    async def test_get_all_sessions(self):
         """Test get_all_sessions returns copy of all sessions."""
-        import chat_util
-        
         session1 = ChatSession(session_id="session-1")
         session2 = ChatSession(session_id="session-2")
         chat_util._sessions = {
@@ -530,53 +716,241 @@ class TestSessionManagement:
             "session-2": session2
         }
         
-        all_sessions = get_all_sessions()
+        all_sessions = await get_all_sessions()
         
         assert len(all_sessions) == 2
         assert all_sessions["session-1"] is session1
         assert all_sessions["session-2"] is session2
         assert all_sessions is not chat_util._sessions  # Should be a copy
+    
+    @pytest.mark.asyncio
+    async def test_iter_sessions(self):
+        """Test iter_sessions yields every session."""
+        session1 = ChatSession(session_id="session-1")
+        session1.conversation_history = [
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": "Hi"}
+        ]
+        chat_util._sessions = {"session-1": session1}
+        
+        items = [item async for item in iter_sessions()]
+        
+        assert items == [("session-1", session1)]
+        assert session1.message_count == 2
+        assert session1.last_message() == {"role": "assistant", "content": "Hi"}
+    
+    @pytest.mark.asyncio
+    async def test_iter_sessions_tolerates_new_sessions(self):
+        """Test sessions created while iterating don't break the iteration."""
+        chat_util._sessions = {"session-1": ChatSession(session_id="session-1")}
+        
+        seen = []
+        async for session_id, _ in iter_sessions():
+            seen.append(session_id)
+            await get_chat_session("session-2")
+        
+        assert seen == ["session-1"]
+        assert "session-2" in chat_util._sessions
+    
+    @pytest.mark.asyncio
+    async def test_find_session(self):
+        """Test find_session looks up a session without creating one."""
+        session = ChatSession(session_id="session-1")
+        chat_util._sessions = {"session-1": session}
+        
+        assert await find_session("session-1") is session
+        assert await find_session("missing") is None
+        assert "missing" not in chat_util._sessions
 
 
-class TestChatSessionIntegration:
-    """Integration tests for ChatSession."""
+class TestRedisSessionStore:
+    """Test suite for Redis-backed session persistence."""
     
     @pytest.fixture
-    def mock_llm_client(self):
-        """Fixture providing a mocked LLM client."""
+    def mock_redis(self):
+        """Fixture providing a mocked Redis client."""
         mock_client = AsyncMock()
+        mock_client.get = AsyncMock(return_value=None)
+        # redis.lock() is synchronous and returns a lock with async methods
+        mock_client.lock = MagicMock(return_value=AsyncMock(acquire=AsyncMock(return_value=True)))
         return mock_client
     
-    @pytest.fixture
-    def mock_mcp_client(self):
-        """Fixture providing a mocked MCP client."""
-        mock_client = AsyncMock(spec=MCPClient)
-        mock_client.tools = []
-        return mock_client
+    @pytest.mark.asyncio
+    async def test_chat_loads_and_saves_history(self, mock_redis, mock_llm_client):
+        """Test chat loads history from Redis and persists it with a TTL."""
+        from src.config import settings
+        
+        mock_redis.get = AsyncMock(return_value=json.dumps([
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello!"}
+        ]))
+        mock_llm_client.chat_completion = async_return(stop_response("Sure"))
+        
+        session = ChatSession(
+            session_id="test-123",
+            llm_client=mock_llm_client,
+            mcp_client=MagicMock(tools=[]),
+            redis=mock_redis
+        )
+        
+        response = await session.chat("Help me")
+        
+        assert response == "Sure"
+        mock_redis.get.assert_called_once_with("sess:test-123")
+        key, payload = mock_redis.set.call_args[0]
+        assert key == "sess:test-123"
+        assert mock_redis.set.call_args[1]["ex"] == settings.SESSION_TTL
+        assert [m["content"] for m in orjson.loads(payload)] == ["Hi", "Hello!", "Help me", "Sure"]
+        mock_redis.lock.assert_called_once_with(
+            "lock:sess:test-123",
+            timeout=settings.SESSION_LOCK_TIMEOUT,
+            blocking_timeout=settings.SESSION_LOCK_WAIT
+        )
+        mock_redis.lock.return_value.release.assert_awaited_once()
     
     @pytest.mark.asyncio
-    async def test_full_conversation_flow(self, mock_llm_client):
+    async def test_chat_raises_when_session_busy(self, mock_redis, mock_llm_client):
+        """Test a turn gives up with SessionBusyError if the Redis lock is not acquired in time."""
+        mock_redis.lock.return_value.acquire = AsyncMock(return_value=False)
+        mock_llm_client.chat_completion = AsyncMock()
+        session = ChatSession(
+            session_id="test-123",
+            llm_client=mock_llm_client,
+            mcp_client=FakeMCPClient(),
+            redis=mock_redis
+        )
+        
+        with pytest.raises(SessionBusyError):
+            await session.chat("Help me")
+        
+        mock_llm_client.chat_completion.assert_not_called()
+        mock_redis.set.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_chat_survives_lost_lock_on_release(self, mock_redis, mock_llm_client):
+        """Test a turn still succeeds when its Redis lock expired before release."""
+        mock_redis.lock.return_value.release = AsyncMock(side_effect=LockNotOwnedError("expired"))
+        mock_llm_client.chat_completion = async_return(stop_response("Sure"))
+        session = ChatSession(
+            session_id="test-123",
+            llm_client=mock_llm_client,
+            mcp_client=FakeMCPClient(),
+            redis=mock_redis
+        )
+        
+        assert await session.chat("Help me") == "Sure"
+        mock_redis.set.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_lock_is_renewed_during_long_turn(self, mock_redis, mock_llm_client, monkeypatch):
+        """Test the Redis lock TTL is renewed while a turn outlasts it."""
+        from src.config import settings
+        
+        monkeypatch.setattr(settings, "SESSION_LOCK_TIMEOUT", 0.03)
+        lock = mock_redis.lock.return_value
+        
+        async def chat_completion(input_data):
+            await asyncio.sleep(0.05)
+            return stop_response("Done")
+        
+        mock_llm_client.chat_completion = chat_completion
+        session = ChatSession(
+            session_id="test-123",
+            llm_client=mock_llm_client,
+            mcp_client=FakeMCPClient(),
+            redis=mock_redis
+        )
+        
+        assert await session.chat("Help me") == "Done"
+        assert lock.reacquire.await_count >= 1
+        reacquired = lock.reacquire.await_count
+        await asyncio.sleep(0.05)
+        # Renewal stops with the turn
+        assert lock.reacquire.await_count == reacquired
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_turns_on_rebuilt_sessions_keep_both(self, mock_redis, mock_llm_client):
+        """Test overlapping turns through separate ChatSession instances don't drop a turn."""
+        store = {}
+        
+        async def get(key):
+            return store.get(key)
+        
+        async def set(key, value, ex=None):
+            # Yield so an unserialized turn could interleave its load here
+            await asyncio.sleep(0)
+            store[key] = value
+        
+        mock_redis.get = get
+        mock_redis.set = set
+        mock_llm_client.chat_completion = async_return(stop_response("OK"))
+        
+        # One ChatSession per request, as get_chat_session builds them with Redis
+        sessions = [
+            ChatSession(
+                session_id="shared",
+                llm_client=mock_llm_client,
+                mcp_client=FakeMCPClient(),
+                redis=mock_redis
+            )
+            for _ in range(2)
+        ]
+        
+        await asyncio.gather(sessions[0].chat("First"), sessions[1].chat("Second"))
+        
+        history = orjson.loads(store["sess:shared"])
+        assert [m["content"] for m in history] == ["First", "OK", "Second", "OK"]
+    
+    @pytest.mark.asyncio
+    async def test_session_functions_use_redis(self, mock_redis):
+        """Test reset/delete/list go through Redis when configured."""
+        async def scan_iter(match):
+            yield "sess:session-1"
+        
+        mock_redis.scan_iter = scan_iter
+        
+        with patch('src.core.chat_util.get_redis', return_value=mock_redis):
+            await reset_session("session-1")
+            await delete_session("session-1")
+            all_sessions = await get_all_sessions()
+        
+        assert mock_redis.delete.call_count == 2
+        mock_redis.delete.assert_called_with("sess:session-1")
+        assert list(all_sessions) == ["session-1"]
+        assert chat_util._sessions == {}
+    
+    @pytest.mark.asyncio
+    async def test_find_session_uses_redis(self, mock_redis):
+        """Test find_session reads a single key from Redis."""
+        mock_redis.get = AsyncMock(side_effect=lambda key: (
+            json.dumps([{"role": "user", "content": "Hi"}]) if key == "sess:session-1" else None
+        ))
+        
+        with patch('src.core.chat_util.get_redis', return_value=mock_redis):
+            session = await find_session("session-1")
+            missing = await find_session("missing")
+        
+        assert session.get_history() == [{"role": "user", "content": "Hi"}]
+        assert missing is None
+
+
+class TestChatSessionIntegration:
+    """Integration tests for ChatSession."""
+    
+    @pytest.mark.asyncio
+    async def test_full_conversation_flow(self, mock_llm_client, mock_mcp_client):
         """Test a full conversation flow with multiple messages."""
         responses = [
-            ChatCompletionResponse(
-                content="Hello! How can I help?",
-                role="assistant",
-                tool_calls=None,
-                finish_reason="stop"
-            ),
-            ChatCompletionResponse(
-                content="Goodbye!",
-                role="assistant",
-                tool_calls=None,
-                finish_reason="stop"
-            )
+            stop_response("Hello! How can I help?"),
+            stop_response("Goodbye!")
         ]
         
         mock_llm_client.chat_completion = AsyncMock(side_effect=responses)
         
         session = ChatSession(
             session_id="test-123",
-            llm_client=mock_llm_client
+            llm_client=mock_llm_client,
+            mcp_client=mock_mcp_client
         )
         
         response1 = await session.chat("Hello")
@@ -589,34 +963,19 @@ class TestChatSessionIntegration:
         assert session.conversation_history[1]["content"] == "Hello! How can I help?"
         assert session.conversation_history[2]["content"] == "Goodbye"
         assert session.conversation_history[3]["content"] == "Goodbye!"
+        
+        # Earlier turns are reused as-is rather than rebuilt on every call
+        second_input = mock_llm_client.chat_completion.call_args_list[1][0][0]
+        assert second_input.messages[1] is session._messages[0]
     
     @pytest.mark.asyncio
     async def test_tool_call_with_invalid_json(self, mock_llm_client, mock_mcp_client):
         """Test tool call handling with invalid JSON arguments."""
-        tool_response = ChatCompletionResponse(
-            content=None,
-            role="assistant",
-            tool_calls=[
-                {
-                    "id": "call_123",
-                    "type": "function",
-                    "function": {
-                        "name": "test_tool",
-                        "arguments": "invalid json{"
-                    }
-                }
-            ],
-            finish_reason="tool_calls"
-        )
+        tool_response = tool_calls_response(tool_call("call_123", "test_tool", "invalid json{"))
         
-        final_response = ChatCompletionResponse(
-            content="Done",
-            role="assistant",
-            tool_calls=None,
-            finish_reason="stop"
-        )
+        final_response = stop_response("Done")
         
-        mock_llm_client.chat_completion = AsyncMock(side_effect=[tool_response, final_response])
+        mock_llm_client.chat_completion = async_sequence(tool_response, final_response)
         mock_mcp_client.call_tool = AsyncMock(return_value={"result": "ok"})
         mock_mcp_client.tools = []
         
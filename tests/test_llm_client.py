@@ -4,13 +4,61 @@ Unit tests for LLMClient.
 """
 
 import pytest
-import os
-from unittest.mock import AsyncMock, MagicMock, patch, Mock
-from openai import AsyncOpenAI
-from src.core.llm_client import LLMClient, get_llm_client, ChatCompletionInput, Message
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch, Mock
+from pydantic import ValidationError
+from src.core.llm_client import (
+    LLMClient,
+    get_llm_client,
+    ChatCompletionInput,
+    Message,
+    ChatCompletionResponse,
+    ToolDefinition,
+    FunctionDefinition
+)
 from src.core import llm_client as llm_client_module
 
 
+def completion_response(content, role="assistant", tool_calls=None, finish_reason="stop"):
+    """Build a stand-in for an OpenAI chat completion with a single choice."""
+    message = SimpleNamespace(content=content, role=role, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+def stream_chunk(content):
+    """Build a stand-in for one OpenAI streaming chunk carrying a text delta."""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+def async_return(value):
+    """
+    Build a stand-in for chat.completions.create that records its kwargs and returns value.
+    
+    Cheaper than AsyncMock for stubs whose await history is never asserted on.
+    """
+    async def stub(**kwargs):
+        stub.calls.append(kwargs)
+        return value
+    stub.calls = []
+    return stub
+
+
+class AsyncList:
+    """Async iterator over a pre-built list, standing in for an OpenAI stream."""
+    
+    def __init__(self, items):
+        self._items = iter(items)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
 class TestLLMClient:
     """Test suite for LLMClient class."""
     
@@ -22,12 +70,22 @@ class TestLLMClient:
     @pytest.fixture
     def mock_openai_client(self):
         """Fixture providing a mocked OpenAI client."""
-        mock_client = AsyncMock(spec=AsyncOpenAI)
-        mock_chat = AsyncMock()
-        mock_completions = AsyncMock()
-        mock_client.chat = mock_chat
-        mock_chat.completions = mock_completions
-        return mock_client, mock_completions
+        # Only chat.completions.create is used, so skip spec'ing the whole SDK client
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock()
+        return mock_client, mock_client.chat.completions
+    
+    @pytest.fixture
+    def mock_completions(self, mock_openai_client):
+        """Fixture providing the mocked chat.completions resource."""
+        return mock_openai_client[1]
+    
+    @pytest.fixture
+    def client(self, mock_api_key, mock_openai_client):
+        """Fixture providing an LLMClient wired to the mocked OpenAI client."""
+        mock_client, _ = mock_openai_client
+        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
+            return LLMClient(api_key=mock_api_key)
     
     def test_init_with_api_key(self, mock_api_key):
         """Test LLMClient initialization with explicit API key."""
@@ -38,23 +96,24 @@ class TestLLMClient:
             assert client.model == "gpt-4o-mini"
             mock_openai.assert_called_once_with(
                 api_key=mock_api_key,
-                base_url=None
+                base_url=None,
+                http_client=llm_client_module.get_http_client()
             )
     
-    def test_init_with_env_var(self, mock_api_key):
+    def test_init_with_env_var(self, mock_api_key, monkeypatch):
         """Test LLMClient initialization with environment variable."""
-        with patch.dict(os.environ, {'OPENAI_API_KEY': mock_api_key}):
-            with patch('src.core.llm_client.AsyncOpenAI') as mock_openai:
-                client = LLMClient()
-                
-                assert client.api_key == mock_api_key
-                mock_openai.assert_called_once()
-    
-    def test_init_without_api_key_raises_error(self):
+        monkeypatch.setenv('OPENAI_API_KEY', mock_api_key)
+        with patch('src.core.llm_client.AsyncOpenAI') as mock_openai:
+            client = LLMClient()
+            
+            assert client.api_key == mock_api_key
+            mock_openai.assert_called_once()
+    
+    def test_init_without_api_key_raises_error(self, monkeypatch):
         """Test that initialization without API key raises ValueError."""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(ValueError, match="OpenAI API key not provided"):
-                LLMClient()
+        monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+        with pytest.raises(ValueError, match="OpenAI API key not provided"):
+            LLMClient()
     
     def test_init_with_custom_model(self, mock_api_key):
         """Test LLMClient initialization with custom model."""
@@ -69,228 +128,279 @@ class TestLLMClient:
             client = LLMClient(api_key=mock_api_key, base_url=base_url)
             mock_openai.assert_called_once_with(
                 api_key=mock_api_key,
-                base_url=base_url
+                base_url=base_url,
+                http_client=llm_client_module.get_http_client()
             )
     
     @pytest.mark.asyncio
-    async def test_chat_completion_success(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_success(self, client, mock_completions):
         """Test successful chat completion."""
-        mock_client, mock_completions = mock_openai_client
+        mock_response = completion_response("Test response")
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = MagicMock()
-        mock_response.choices[0].message.content = "Test response"
-        mock_response.choices[0].message.role = "assistant"
-        mock_response.choices[0].message.tool_calls = None
-        mock_response.choices[0].finish_reason = "stop"
+        mock_completions.create = async_return(mock_response)
         
-        mock_completions.create = AsyncMock(return_value=mock_response)
+        input_data = ChatCompletionInput(
+            messages=[Message(role="user", content="Hello")]
+        )
+        response = await client.chat_completion(input_data)
         
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            input_data = ChatCompletionInput(
-                messages=[Message(role="user", content="Hello")]
-            )
-            response = await client.chat_completion(input_data)
-            
-            assert response.content == "Test response"
-            assert response.role == "assistant"
-            mock_completions.create.assert_called_once()
+        assert response.content == "Test response"
+        assert response.role == "assistant"
+        assert len(mock_completions.create.calls) == 1
     
     @pytest.mark.asyncio
-    async def test_chat_completion_with_custom_params(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_with_custom_params(self, client, mock_completions):
         """Test chat completion with custom parameters."""
-        mock_client, mock_completions = mock_openai_client
-        
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = MagicMock()
-        mock_response.choices[0].message.content = "Custom response"
-        mock_response.choices[0].message.role = "assistant"
-        mock_response.choices[0].message.tool_calls = None
-        mock_response.choices[0].finish_reason = "stop"
+        mock_response = completion_response("Custom response")
         
         mock_completions.create = AsyncMock(return_value=mock_response)
         
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            input_data = ChatCompletionInput(
-                messages=[Message(role="user", content="Hello")],
-                temperature=0.9,
-                max_tokens=100,
-                stream=False
-            )
-            response = await client.chat_completion(input_data)
-            
-            assert response.content == "Custom response"
-            call_args = mock_completions.create.call_args
-            assert call_args[1]['temperature'] == 0.9
-            assert call_args[1]['max_tokens'] == 100
+        input_data = ChatCompletionInput(
+            messages=[Message(role="user", content="Hello")],
+            temperature=0.9,
+            max_tokens=100,
+            stream=False
+        )
+        response = await client.chat_completion(input_data)
+        
+        assert response.content == "Custom response"
+        mock_completions.create.assert_awaited_once_with(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hello"}],
+            temperature=0.9,
+            max_tokens=100,
+            stream=False
+        )
     
     @pytest.mark.asyncio
-    async def test_chat_completion_error_handling(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_error_handling(self, client, mock_completions):
         """Test chat completion error handling."""
-        mock_client, mock_completions = mock_openai_client
-        
-        mock_completions.create = AsyncMock(side_effect=Exception("API Error"))
+        mock_completions.create = AsyncMock(side_effect=ConnectionError("API Error"))
         
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            input_data = ChatCompletionInput(
-                messages=[Message(role="user", content="Hello")]
-            )
-            with pytest.raises(Exception, match="Error calling OpenAI API"):
-                await client.chat_completion(input_data)
+        input_data = ChatCompletionInput(
+            messages=[Message(role="user", content="Hello")]
+        )
+        # The original exception type reaches the caller unwrapped
+        with pytest.raises(ConnectionError, match="API Error"):
+            await client.chat_completion(input_data)
     
     @pytest.mark.asyncio
-    async def test_chat_completion_stream(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_stream(self, client, mock_completions):
         """Test streaming chat completion."""
-        mock_client, mock_completions = mock_openai_client
+        mock_completions.create = async_return(AsyncList([
+            stream_chunk("Hello"),
+            stream_chunk(" World")
+        ]))
         
-        # Create mock stream chunks
-        mock_chunk1 = MagicMock()
-        mock_chunk1.choices = [MagicMock()]
-        mock_chunk1.choices[0].delta = MagicMock()
-        mock_chunk1.choices[0].delta.content = "Hello"
+        input_data = ChatCompletionInput(
+            messages=[Message(role="user", content="Hello")]
+        )
+        chunks = []
+        async for chunk in client.chat_completion_stream(input_data):
+            chunks.append(chunk)
         
-        mock_chunk2 = MagicMock()
-        mock_chunk2.choices = [MagicMock()]
-        mock_chunk2.choices[0].delta = MagicMock()
-        mock_chunk2.choices[0].delta.content = " World"
-        
-        async def mock_stream():
-            yield mock_chunk1
-            yield mock_chunk2
-        
-        mock_completions.create = AsyncMock(return_value=mock_stream())
-        
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            input_data = ChatCompletionInput(
-                messages=[Message(role="user", content="Hello")]
-            )
-            chunks = []
-            async for chunk in client.chat_completion_stream(input_data):
-                chunks.append(chunk)
-            
-            assert chunks == ["Hello", " World"]
+        assert chunks == ["Hello", " World"]
     
     @pytest.mark.asyncio
-    async def test_chat_completion_stream_error_handling(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_stream_error_handling(self, client, mock_completions):
         """Test streaming chat completion error handling."""
-        mock_client, mock_completions = mock_openai_client
+        mock_completions.create = AsyncMock(side_effect=ConnectionError("Stream Error"))
         
-        mock_completions.create = AsyncMock(side_effect=Exception("Stream Error"))
-        
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            input_data = ChatCompletionInput(
-                messages=[Message(role="user", content="Hello")]
-            )
-            with pytest.raises(Exception, match="Error streaming from OpenAI API"):
-                async for _ in client.chat_completion_stream(input_data):
-                    pass
+        input_data = ChatCompletionInput(
+            messages=[Message(role="user", content="Hello")]
+        )
+        with pytest.raises(ConnectionError, match="Stream Error"):
+            async for _ in client.chat_completion_stream(input_data):
+                pass
     
     @pytest.mark.asyncio
-    async def test_chat_completion_simple(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_simple(self, client, mock_completions):
         """Test simple chat completion."""
-        mock_client, mock_completions = mock_openai_client
-        
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = MagicMock()
-        mock_response.choices[0].message.content = "Simple response"
-        mock_response.choices[0].message.role = "assistant"
-        mock_response.choices[0].message.tool_calls = None
-        mock_response.choices[0].finish_reason = "stop"
+        mock_response = completion_response("Simple response")
         
         mock_completions.create = AsyncMock(return_value=mock_response)
         
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            response = await client.chat_completion_simple("Hello")
-            
-            assert response == "Simple response"
-            call_args = mock_completions.create.call_args
-            assert call_args[1]['messages'][-1]['role'] == 'user'
-            assert call_args[1]['messages'][-1]['content'] == "Hello"
+        response = await client.chat_completion_simple("Hello")
+        
+        assert response == "Simple response"
+        mock_completions.create.assert_awaited_once_with(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hello"}],
+            temperature=0.7,
+            stream=False
+        )
     
     @pytest.mark.asyncio
-    async def test_chat_completion_simple_with_system_message(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_simple_with_system_message(self, client, mock_completions):
         """Test simple chat completion with system message."""
-        mock_client, mock_completions = mock_openai_client
+        mock_response = completion_response("Response with system")
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = MagicMock()
-        mock_response.choices[0].message.content = "Response with system"
-        mock_response.choices[0].message.role = "assistant"
-        mock_response.choices[0].message.tool_calls = None
-        mock_response.choices[0].finish_reason = "stop"
+        mock_completions.create = async_return(mock_response)
         
-        mock_completions.create = AsyncMock(return_value=mock_response)
+        response = await client.chat_completion_simple(
+            "Hello",
+            system_message="You are a helpful assistant"
+        )
         
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            response = await client.chat_completion_simple(
-                "Hello",
-                system_message="You are a helpful assistant"
-            )
-            
-            assert response == "Response with system"
-            call_args = mock_completions.create.call_args
-            messages = call_args[1]['messages']
-            assert messages[0]['role'] == 'system'
-            assert messages[0]['content'] == "You are a helpful assistant"
-            assert messages[1]['role'] == 'user'
-            assert messages[1]['content'] == "Hello"
+        assert response == "Response with system"
+        assert mock_completions.create.calls[0]["messages"] == [
+            {"role": "system", "content": "You are a helpful assistant"},
+            {"role": "user", "content": "Hello"}
+        ]
     
     @pytest.mark.asyncio
-    async def test_chat_completion_simple_with_history(self, mock_api_key, mock_openai_client):
+    async def test_chat_completion_simple_with_history(self, client, mock_completions):
         """Test simple chat completion with conversation history."""
-        mock_client, mock_completions = mock_openai_client
+        mock_response = completion_response("Response with history")
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = MagicMock()
-        mock_response.choices[0].message.content = "Response with history"
-        mock_response.choices[0].message.role = "assistant"
-        mock_response.choices[0].message.tool_calls = None
-        mock_response.choices[0].finish_reason = "stop"
+        mock_completions.create = async_return(mock_response)
         
-        mock_completions.create = AsyncMock(return_value=mock_response)
+        history = [
+            Message(role="user", content="First message"),
+            Message(role="assistant", content="First response")
+        ]
         
-        with patch('src.core.llm_client.AsyncOpenAI', return_value=mock_client):
-            client = LLMClient(api_key=mock_api_key)
-            
-            history = [
-                Message(role="user", content="First message"),
-                Message(role="assistant", content="First response")
-            ]
-            
-            response = await client.chat_completion_simple(
-                "Second message",
-                conversation_history=history
-            )
-            
-            assert response == "Response with history"
-            call_args = mock_completions.create.call_args
-            messages = call_args[1]['messages']
-            assert len(messages) == 3
-            assert messages[0]['role'] == 'user'
-            assert messages[0]['content'] == "First message"
-            assert messages[1]['role'] == 'assistant'
-            assert messages[1]['content'] == "First response"
-            assert messages[2]['role'] == 'user'
-            assert messages[2]['content'] == "Second message"
+        response = await client.chat_completion_simple(
+            "Second message",
+            conversation_history=history
+        )
+        
+        assert response == "Response with history"
+        assert mock_completions.create.calls[0]["messages"] == [
+            {"role": "user", "content": "First message"},
+            {"role": "assistant", "content": "First response"},
+            {"role": "user", "content": "Second message"}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_chat_completion_raw_omits_unset_params(self, client, mock_completions):
+        """Test raw completion only sends options that were set."""
+        mock_completions.create = AsyncMock(return_value=Mock())
+        
+        await client.chat_completion_raw(
+            messages=[{"role": "user", "content": "Hello"}],
+            tool_choice="auto",
+            top_p=0.5
+        )
+        
+        mock_completions.create.assert_awaited_once_with(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hello"}],
+            temperature=0.7,
+            stream=False,
+            tool_choice="auto",
+            top_p=0.5
+        )
+    
+    @pytest.mark.asyncio
+    async def test_chat_completion_stream_raw_skips_empty_chunks(self, client, mock_completions):
+        """Test raw streaming skips chunks without choices or content."""
+        # Text, empty delta, then a usage chunk with no choices
+        mock_completions.create = async_return(AsyncList([
+            stream_chunk("Hello"),
+            stream_chunk(None),
+            SimpleNamespace(choices=[])
+        ]))
+        
+        chunks = [c async for c in client.chat_completion_stream_raw([{"role": "user", "content": "Hi"}])]
+        
+        assert chunks == ["Hello"]
+        assert mock_completions.create.calls[0]["stream"] is True
+
+
+class TestModels:
+    """Test suite for the request models."""
+    
+    def test_message_to_dict_is_cached(self):
+        """Test Message's OpenAI dict is computed once and omits unset fields."""
+        message = Message(role="user", content="Hello")
+        
+        assert message.to_dict() == {"role": "user", "content": "Hello"}
+        assert message.openai_dict is message.openai_dict
+    
+    def test_message_to_dict_returns_copy(self):
+        """Test modifying a to_dict() result does not change the cached dict."""
+        message = Message(role="user", content="Hello")
+        
+        result = message.to_dict()
+        result["content"] = "Changed"
+        
+        assert message.to_dict() == {"role": "user", "content": "Hello"}
+        assert message.openai_dict == {"role": "user", "content": "Hello"}
+    
+    def test_message_copy_with_update_recomputes_dict(self):
+        """Test model_copy(update=...) does not reuse a stale cached dict."""
+        message = Message(role="user", content="Hello")
+        message.to_dict()
+        
+        copy = message.model_copy(update={"content": "Bye"})
+        
+        assert copy.to_dict() == {"role": "user", "content": "Bye"}
+    
+    def test_models_are_frozen(self):
+        """Test messages and tools cannot be mutated after their dict is cached."""
+        message = Message(role="user", content="Hello")
+        
+        with pytest.raises(ValidationError):
+            message.content = "Changed"
+    
+    def test_message_rejects_unknown_fields(self):
+        """Test messages reject fields the OpenAI API does not know about."""
+        with pytest.raises(ValidationError):
+            Message(role="user", content="Hello", unknown="value")
+    
+    def test_tools_serialized_once(self):
+        """Test to_openai_dict reuses each tool's cached dict."""
+        tool = ToolDefinition(function=FunctionDefinition(
+            name="test_tool",
+            description="A test tool",
+            parameters={"type": "object", "properties": {}}
+        ))
+        input_data = ChatCompletionInput(messages=[Message(role="user", content="Hi")], tools=[tool])
+        
+        first = input_data.to_openai_dict()
+        second = input_data.to_openai_dict()
+        
+        assert first["tools"][0] == {
+            "type": "function",
+            "function": {
+                "name": "test_tool",
+                "description": "A test tool",
+                "parameters": {"type": "object", "properties": {}}
+            }
+        }
+        assert first["tools"][0] is second["tools"][0]
+    
+    def test_response_from_openai_text(self):
+        """Test a plain text reply is converted without tool calls."""
+        mock_response = completion_response("Hi there")
+        
+        response = ChatCompletionResponse.from_openai_response(mock_response)
+        
+        assert response.content == "Hi there"
+        assert response.tool_calls is None
+        assert response.finish_reason == "stop"
+    
+    def test_response_from_openai_tool_calls(self):
+        """Test tool calls are converted to plain dicts."""
+        tool_call = SimpleNamespace(
+            id="call_123",
+            function=SimpleNamespace(name="test_tool", arguments='{"param": "value"}')
+        )
+        mock_response = completion_response(None, tool_calls=[tool_call], finish_reason="tool_calls")
+        
+        response = ChatCompletionResponse.from_openai_response(mock_response)
+        
+        assert response.tool_calls[0].id == "call_123"
+        assert response.tool_calls[0].function.name == "test_tool"
+        assert response.tool_calls[0].function.arguments == '{"param": "value"}'
+        # Assistant messages send the tool calls back to OpenAI as plain dicts
+        message = Message(role="assistant", tool_calls=response.tool_calls)
+        assert message.to_dict()["tool_calls"] == [{
+            "id": "call_123",
+            "type": "function",
+            "function": {"name": "test_tool", "arguments": '{"param": "value"}'}
+        }]
 
 
 class TestGetLLMClient:
@@ -299,49 +409,83 @@ class TestGetLLMClient:
     @pytest.fixture(autouse=True)
     def reset_global_client(self):
         """Reset global client before each test."""
-        llm_client_module._client = None
+        llm_client_module._clients.clear()
         yield
-        llm_client_module._client = None
+        llm_client_module._clients.clear()
     
-    def test_get_llm_client_creates_new_instance(self):
+    def test_get_llm_client_creates_new_instance(self, monkeypatch):
         """Test that get_llm_client creates a new instance."""
-        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}):
-            with patch('src.core.llm_client.LLMClient') as mock_client_class:
-                mock_instance = MagicMock()
-                mock_client_class.return_value = mock_instance
-                
-                client1 = get_llm_client()
-                client2 = get_llm_client()
-                
-                # Should return the same instance (singleton)
-                assert client1 is client2
-                # But should only create once
-                assert mock_client_class.call_count == 1
-    
-    def test_get_llm_client_with_custom_model(self):
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        with patch('src.core.llm_client.LLMClient') as mock_client_class:
+            mock_instance = Mock()
+            mock_client_class.return_value = mock_instance
+            
+            client1 = get_llm_client()
+            client2 = get_llm_client()
+            
+            # Should return the same instance (singleton)
+            assert client1 is client2
+            # But should only create once
+            assert mock_client_class.call_count == 1
+    
+    def test_get_llm_client_with_custom_model(self, monkeypatch):
         """Test get_llm_client with custom model."""
-        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}):
-            with patch('src.core.llm_client.LLMClient') as mock_client_class:
-                mock_instance = MagicMock()
-                mock_client_class.return_value = mock_instance
-                
-                client = get_llm_client(model="gpt-4")
-                
-                mock_client_class.assert_called_once_with(
-                    api_key=None,
-                    model="gpt-4"
-                )
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        with patch('src.core.llm_client.LLMClient') as mock_client_class:
+            mock_instance = Mock()
+            mock_client_class.return_value = mock_instance
+            
+            client = get_llm_client(model="gpt-4")
+            
+            mock_client_class.assert_called_once_with(
+                api_key=None,
+                model="gpt-4",
+                base_url=None
+            )
     
     def test_get_llm_client_with_api_key(self):
         """Test get_llm_client with explicit API key."""
         with patch('src.core.llm_client.LLMClient') as mock_client_class:
-            mock_instance = MagicMock()
+            mock_instance = Mock()
             mock_client_class.return_value = mock_instance
             
             client = get_llm_client(api_key="custom-key")
             
             mock_client_class.assert_called_once_with(
                 api_key="custom-key",
-                model="gpt-4o-mini"
+                model="gpt-4o-mini",
+                base_url=None
             )
-
+    
+    
+    def test_get_llm_client_caches_per_model(self, monkeypatch):
+        """Test that different models get separate clients sharing one transport."""
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        client1 = get_llm_client(model="gpt-4o-mini")
+        client2 = get_llm_client(model="gpt-4")
+        
+        assert client1 is not client2
+        assert get_llm_client(model="gpt-4") is client2
+        assert client1.client._client is client2.client._client
+    
+    def test_http_client_keeps_sdk_defaults(self, monkeypatch):
+        """Test the shared transport keeps the SDK's redirect handling and long read timeout."""
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        http_client = get_llm_client().client._client
+        
+        assert http_client.follow_redirects is True
+        assert http_client.timeout.read == 600.0
+        assert http_client.timeout.connect == 10.0
+    
+    @pytest.mark.asyncio
+    async def test_close_llm_clients(self, monkeypatch):
+        """Test that close_llm_clients closes the shared transport and forgets clients."""
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        client = get_llm_client()
+        http_client = client.client._client
+        
+        await llm_client_module.close_llm_clients()
+        
+        assert http_client.is_closed
+        assert llm_client_module._clients == {}
+        assert get_llm_client() is not client
@@ -4,25 +4,49 @@ Unit tests for MCPClient.
 """
 
 import pytest
+import asyncio
 import json
-import os
-from unittest.mock import AsyncMock, MagicMock, patch, Mock
-from src.core.mcp_client import MCPClient, get_mcp_client
+import httpx
+from unittest.mock import AsyncMock, patch
+from src.core.mcp_client import MCPClient, get_mcp_client, close_mcp_client
 from src.core import mcp_client as mcp_client_module
 
 
+# JSON-RPC request ID pinned by the request_id fixture
+REQUEST_ID = "test-request-id"
+
+
+def use_transport(client: MCPClient, handler):
+    """Route the client's HTTP requests to a handler instead of the network."""
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def sse_response(events):
+    """Build a text/event-stream response with one event per data payload."""
+    body = "".join(f"event: message\ndata: {data}\n\n" for data in events)
+    return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, content=body.encode())
+
+
+@pytest.fixture
+def server_url():
+    """Fixture providing a test server URL."""
+    return "https://test-mcp-server.com/mcp"
+
+
+@pytest.fixture
+def mcp_client(server_url):
+    """Fixture providing an MCPClient instance."""
+    return MCPClient(server_url)
+
+
 class TestMCPClient:
     """Test suite for MCPClient class."""
     
     @pytest.fixture
-    def server_url(self):
-        """Fixture providing a test server URL."""
-        return "https://test-mcp-server.com/mcp"
-    
-    @pytest.fixture
-    def mcp_client(self, server_url):
-        """Fixture providing an MCPClient instance."""
-        return MCPClient(server_url)
+    def request_id(self, mcp_client, monkeypatch):
+        """Fixture pinning the JSON-RPC request ID used by mcp_client."""
+        monkeypatch.setattr(mcp_client, "_next_request_id", lambda: REQUEST_ID)
+        return REQUEST_ID
     
     def test_init(self, server_url):
         """Test MCPClient initialization."""
@@ -37,115 +61,99 @@ class TestMCPClient:
         client = MCPClient("https://test.com/mcp/")
         assert client.server_url == "https://test.com/mcp"
     
-    @pytest.mark.asyncio
-    async def test_send_jsonrpc_request_json_response(self, mcp_client):
-        """Test _send_jsonrpc_request with JSON response."""
-        request_id = "test-request-id"
-        mock_result = {"tools": [{"name": "test_tool"}]}
+    def test_next_request_id_unique(self, server_url):
+        """Test that request IDs are unique within and across clients."""
+        client1 = MCPClient(server_url)
+        client2 = MCPClient(server_url)
         
-        mock_response = MagicMock()
-        mock_response.headers = {"Content-Type": "application/json"}
-        mock_response.json.return_value = {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": mock_result
-        }
-        mock_response.raise_for_status = Mock()
+        ids = [client1._next_request_id() for _ in range(3)]
+        ids.append(client2._next_request_id())
         
-        with patch('src.core.mcp_client.requests.post', return_value=mock_response):
-            with patch('uuid.uuid4', return_value=Mock(__str__=lambda x: request_id)):
-                result = await mcp_client._send_jsonrpc_request("tools/list")
-                
-                assert result == mock_result
-                mock_response.raise_for_status.assert_called_once()
+        assert len(set(ids)) == 4
+        assert ids[0].endswith("-1")
+        assert ids[1].endswith("-2")
     
     @pytest.mark.asyncio
-    async def test_send_jsonrpc_request_sse_response(self, mcp_client):
-        """Test _send_jsonrpc_request with SSE stream response."""
-        request_id = "test-request-id"
+    async def test_send_jsonrpc_request_json_response(self, mcp_client, request_id):
+        """Test _send_jsonrpc_request with JSON response."""
         mock_result = {"tools": [{"name": "test_tool"}]}
         
-        # Mock SSE events
-        mock_event1 = MagicMock()
-        mock_event1.data = json.dumps({
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": mock_result
-        })
-        
-        mock_event2 = MagicMock()
-        mock_event2.data = None
+        def handler(request):
+            assert json.loads(request.content)["method"] == "tools/list"
+            assert request.url == mcp_client._url
+            assert request.headers["Accept"] == "text/event-stream, application/json"
+            return httpx.Response(200, json={
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": mock_result
+            })
         
-        mock_sse_client = MagicMock()
-        mock_sse_client.events.return_value = [mock_event1, mock_event2]
+        use_transport(mcp_client, handler)
+        result = await mcp_client._send_jsonrpc_request("tools/list")
         
-        mock_response = MagicMock()
-        mock_response.headers = {"Content-Type": "text/event-stream"}
-        mock_response.raise_for_status = Mock()
+        assert result == mock_result
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("events, expected", [
+        # Our response in a single event
+        (
+            [json.dumps({"jsonrpc": "2.0", "id": REQUEST_ID, "result": {"tools": [{"name": "test_tool"}]}})],
+            {"tools": [{"name": "test_tool"}]}
+        ),
+        # Unrelated event, then a non-JSON event, then ours split over two data lines
+        (
+            [
+                json.dumps({"jsonrpc": "2.0", "id": "other-id", "result": {}}),
+                "not json",
+                '{"jsonrpc": "2.0", "id": "%s",\ndata: "result": {"success": true}}' % REQUEST_ID
+            ],
+            {"success": True}
+        ),
+        # Stream ends without a response to our request
+        (
+            [json.dumps({"jsonrpc": "2.0", "id": "different-id", "result": {}})],
+            pytest.raises(Exception, match="No response received")
+        )
+    ], ids=["single_event", "multiple_events", "no_response"])
+    async def test_send_jsonrpc_request_sse(self, mcp_client, request_id, events, expected):
+        """Test _send_jsonrpc_request reading the response from an SSE stream."""
+        use_transport(mcp_client, lambda request: sse_response(events))
         
-        with patch('src.core.mcp_client.requests.post', return_value=mock_response):
-            with patch('src.core.mcp_client.SSEClient', return_value=mock_sse_client):
-                with patch('uuid.uuid4', return_value=Mock(__str__=lambda x: request_id)):
-                    result = await mcp_client._send_jsonrpc_request("tools/list")
-                    
-                    assert result == mock_result
+        if isinstance(expected, dict):
+            assert await mcp_client._send_jsonrpc_request("tools/list") == expected
+        else:
+            with expected:
+                await mcp_client._send_jsonrpc_request("tools/list")
     
     @pytest.mark.asyncio
-    async def test_send_jsonrpc_request_error_response(self, mcp_client):
+    async def test_send_jsonrpc_request_error_response(self, mcp_client, request_id):
         """Test _send_jsonrpc_request with error response."""
-        request_id = "test-request-id"
         error_data = {"code": -1, "message": "Test error"}
         
-        mock_response = MagicMock()
-        mock_response.headers = {"Content-Type": "application/json"}
-        mock_response.json.return_value = {
+        use_transport(mcp_client, lambda request: httpx.Response(200, json={
             "jsonrpc": "2.0",
             "id": request_id,
             "error": error_data
-        }
-        mock_response.raise_for_status = Mock()
-        
-        with patch('src.core.mcp_client.requests.post', return_value=mock_response):
-            with patch('uuid.uuid4', return_value=Mock(__str__=lambda x: request_id)):
-                with pytest.raises(Exception, match="MCP Error"):
-                    await mcp_client._send_jsonrpc_request("tools/list")
+        }))
+        with pytest.raises(Exception, match="MCP Error"):
+            await mcp_client._send_jsonrpc_request("tools/list")
     
     @pytest.mark.asyncio
-    async def test_send_jsonrpc_request_unexpected_content_type(self, mcp_client):
-        """Test _send_jsonrpc_request with unexpected content type."""
-        mock_response = MagicMock()
-        mock_response.headers = {"Content-Type": "text/plain"}
-        mock_response.raise_for_status = Mock()
+    async def test_send_jsonrpc_request_http_error(self, mcp_client):
+        """Test _send_jsonrpc_request raises on HTTP error status."""
+        use_transport(mcp_client, lambda request: httpx.Response(500))
         
-        with patch('src.core.mcp_client.requests.post', return_value=mock_response):
-            with patch('uuid.uuid4', return_value=Mock(__str__=lambda x: "test-id")):
-                with pytest.raises(Exception, match="Unexpected Content-Type"):
-                    await mcp_client._send_jsonrpc_request("tools/list")
+        with pytest.raises(httpx.HTTPStatusError):
+            await mcp_client._send_jsonrpc_request("tools/list")
     
     @pytest.mark.asyncio
-    async def test_send_jsonrpc_request_no_response(self, mcp_client):
-        """Test _send_jsonrpc_request when no response is received."""
-        request_id = "test-request-id"
-        
-        mock_event = MagicMock()
-        mock_event.data = json.dumps({
-            "jsonrpc": "2.0",
-            "id": "different-id",
-            "result": {}
-        })
-        
-        mock_sse_client = MagicMock()
-        mock_sse_client.events.return_value = [mock_event]
-        
-        mock_response = MagicMock()
-        mock_response.headers = {"Content-Type": "text/event-stream"}
-        mock_response.raise_for_status = Mock()
-        
-        with patch('src.core.mcp_client.requests.post', return_value=mock_response):
-            with patch('src.core.mcp_client.SSEClient', return_value=mock_sse_client):
-                with patch('uuid.uuid4', return_value=Mock(__str__=lambda x: request_id)):
-                    with pytest.raises(Exception, match="No response received"):
-                        await mcp_client._send_jsonrpc_request("tools/list")
+    async def test_send_jsonrpc_request_unexpected_content_type(self, mcp_client):
+        """Test _send_jsonrpc_request with unexpected content type."""
+        use_transport(mcp_client, lambda request: httpx.Response(
+            200, headers={"Content-Type": "text/plain"}, content=b"hello"
+        ))
+        with pytest.raises(Exception, match="Unexpected Content-Type"):
+            await mcp_client._send_jsonrpc_request("tools/list")
     
     @pytest.mark.asyncio
     async def test_initialize_success(self, mcp_client):
@@ -239,6 +247,46 @@ class TestMCPClient:
             with pytest.raises(Exception, match=f"Error calling tool {tool_name}"):
                 await mcp_client.call_tool(tool_name, arguments)
     
+    @pytest.mark.asyncio
+    async def test_call_tools_batch_returns_results_in_order(self, mcp_client):
+        """Test batched tool calls return results (and errors) in call order."""
+        async def call_tool(tool_name, arguments):
+            if tool_name == "bad_tool":
+                raise Exception("Tool error")
+            return {"tool": tool_name, **arguments}
+        
+        with patch.object(mcp_client, 'call_tool', side_effect=call_tool):
+            results = await mcp_client.call_tools_batch([
+                ("tool_a", {"x": 1}),
+                ("bad_tool", {}),
+                ("tool_b", {})
+            ])
+        
+        assert results[0] == {"tool": "tool_a", "x": 1}
+        assert isinstance(results[1], Exception)
+        assert results[2] == {"tool": "tool_b"}
+    
+    @pytest.mark.asyncio
+    async def test_call_tools_batch_bounds_concurrency(self, server_url):
+        """Test no more than max_parallel_tools calls run at once."""
+        client = MCPClient(server_url, max_parallel_tools=2)
+        in_flight = 0
+        peak = 0
+        
+        async def call_tool(tool_name, arguments):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return tool_name
+        
+        with patch.object(client, 'call_tool', side_effect=call_tool):
+            results = await client.call_tools_batch([(f"tool_{i}", {}) for i in range(5)])
+        
+        assert results == [f"tool_{i}" for i in range(5)]
+        assert peak == 2
+    
     @pytest.mark.asyncio
     async def test_close(self, mcp_client):
         """Test closing the client."""
@@ -261,115 +309,106 @@ class TestGetMCPClient:
             pass
     
     @pytest.mark.asyncio
-    async def test_get_mcp_client_creates_new_instance(self):
+    async def test_get_mcp_client_creates_new_instance(self, monkeypatch):
         """Test that get_mcp_client creates a new instance."""
-        with patch.dict(os.environ, {'MCP_SERVER_URL': 'https://test-server.com/mcp'}):
-            with patch('src.core.mcp_client.MCPClient') as mock_client_class:
-                mock_instance = AsyncMock()
-                mock_instance.initialize = AsyncMock()
-                mock_client_class.return_value = mock_instance
-                
-                client1 = await get_mcp_client()
-                client2 = await get_mcp_client()
-                
-                # Should return the same instance (singleton)
-                assert client1 is client2
-                # Should only create once
-                assert mock_client_class.call_count == 1
-                # Should initialize once
-                assert mock_instance.initialize.call_count == 1
+        monkeypatch.setenv('MCP_SERVER_URL', 'https://test-server.com/mcp')
+        with patch('src.core.mcp_client.MCPClient') as mock_client_class:
+            mock_instance = AsyncMock()
+            mock_instance.initialize = AsyncMock()
+            mock_client_class.return_value = mock_instance
+            
+            client1 = await get_mcp_client()
+            client2 = await get_mcp_client()
+            
+            # Should return the same instance (singleton)
+            assert client1 is client2
+            # Should only create once
+            assert mock_client_class.call_count == 1
+            # Should initialize once
+            assert mock_instance.initialize.call_count == 1
     
     @pytest.mark.asyncio
-    async def test_get_mcp_client_uses_default_url(self):
+    async def test_get_mcp_client_concurrent_callers_share_instance(self):
+        """Test that concurrent first calls create and initialize one client."""
+        with patch('src.core.mcp_client.MCPClient') as mock_client_class:
+            mock_instance = AsyncMock()
+            
+            async def slow_initialize():
+                await asyncio.sleep(0.01)
+            
+            mock_instance.initialize = AsyncMock(side_effect=slow_initialize)
+            mock_client_class.return_value = mock_instance
+            
+            clients = await asyncio.gather(*[get_mcp_client() for _ in range(5)])
+            
+            assert all(client is mock_instance for client in clients)
+            assert mock_client_class.call_count == 1
+            assert mock_instance.initialize.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_get_mcp_client_uses_default_url(self, monkeypatch):
         """Test that get_mcp_client uses default URL when env var not set."""
         default_url = 'https://vipfapwm3x.us-east-1.awsapprunner.com/mcp'
         
-        with patch.dict(os.environ, {}, clear=True):
-            with patch('src.core.mcp_client.MCPClient') as mock_client_class:
-                mock_instance = AsyncMock()
-                mock_instance.initialize = AsyncMock()
-                mock_client_class.return_value = mock_instance
-                
-                await get_mcp_client()
-                
-                # MCPClient is called with positional argument
-                mock_client_class.assert_called_once_with(default_url)
+        monkeypatch.delenv('MCP_SERVER_URL', raising=False)
+        with patch('src.core.mcp_client.MCPClient') as mock_client_class:
+            mock_instance = AsyncMock()
+            mock_instance.initialize = AsyncMock()
+            mock_client_class.return_value = mock_instance
+            
+            await get_mcp_client()
+            
+            # MCPClient is called with positional argument
+            mock_client_class.assert_called_once_with(default_url)
     
     @pytest.mark.asyncio
-    async def test_get_mcp_client_uses_env_var(self):
+    async def test_get_mcp_client_uses_env_var(self, monkeypatch):
         """Test that get_mcp_client uses MCP_SERVER_URL from environment."""
         custom_url = 'https://custom-server.com/mcp'
         
-        with patch.dict(os.environ, {'MCP_SERVER_URL': custom_url}):
-            with patch('src.core.mcp_client.MCPClient') as mock_client_class:
-                mock_instance = AsyncMock()
-                mock_instance.initialize = AsyncMock()
-                mock_client_class.return_value = mock_instance
-                
-                await get_mcp_client()
-                
-                # MCPClient is called with positional argument
-                mock_client_class.assert_called_once_with(custom_url)
+        monkeypatch.setenv('MCP_SERVER_URL', custom_url)
+        with patch('src.core.mcp_client.MCPClient') as mock_client_class:
+            mock_instance = AsyncMock()
+            mock_instance.initialize = AsyncMock()
+            mock_client_class.return_value = mock_instance
+            
+            await get_mcp_client()
+            
+            # MCPClient is called with positional argument
+            mock_client_class.assert_called_once_with(custom_url)
+    
+    @pytest.mark.asyncio
+    async def test_close_mcp_client(self):
+        """Test that close_mcp_client closes and drops the shared instance."""
+        with patch('src.core.mcp_client.MCPClient') as mock_client_class:
+            mock_instance = AsyncMock()
+            mock_client_class.return_value = mock_instance
+            
+            await get_mcp_client()
+            await close_mcp_client()
+            
+            mock_instance.close.assert_awaited_once()
+            assert mcp_client_module._client is None
+            
+            # Safe to call again with no client
+            await close_mcp_client()
 
 
 class TestMCPClientIntegration:
     """Integration-style tests for MCPClient."""
     
     @pytest.mark.asyncio
-    async def test_full_workflow(self):
+    async def test_full_workflow(self, mcp_client, monkeypatch):
         """Test a full workflow: init -> initialize -> call_tool."""
-        server_url = "https://test-server.com/mcp"
-        client = MCPClient(server_url)
-        
-        # Mock the initialization
         init_result = {"tools": [{"name": "test_tool"}]}
         tool_result = {"output": "success"}
+        mock_request = AsyncMock(side_effect=[init_result, tool_result])
+        monkeypatch.setattr(mcp_client, "_send_jsonrpc_request", mock_request)
         
-        with patch.object(client, '_send_jsonrpc_request') as mock_request:
-            mock_request.side_effect = [init_result, tool_result]
-            
-            # Initialize
-            await client.initialize()
-            assert client._initialized is True
-            assert len(client.tools) == 1
-            
-            # Call tool
-            result = await client.call_tool("test_tool", {"param": "value"})
-            assert result == tool_result
-            
-            # Verify calls
-            assert mock_request.call_count == 2
-    
-    @pytest.mark.asyncio
-    async def test_sse_stream_parsing(self):
-        """Test SSE stream event parsing with multiple events."""
-        server_url = "https://test-server.com/mcp"
-        client = MCPClient(server_url)
-        request_id = "test-id"
-        
-        # Create multiple events
-        events_data = [
-            json.dumps({"jsonrpc": "2.0", "id": "other-id", "result": {}}),
-            json.dumps({"jsonrpc": "2.0", "id": request_id, "result": {"success": True}}),
-        ]
+        await mcp_client.initialize()
+        assert mcp_client._initialized is True
+        assert len(mcp_client.tools) == 1
         
-        mock_events = []
-        for data in events_data:
-            event = MagicMock()
-            event.data = data
-            mock_events.append(event)
-        
-        mock_sse_client = MagicMock()
-        mock_sse_client.events.return_value = mock_events
-        
-        mock_response = MagicMock()
-        mock_response.headers = {"Content-Type": "text/event-stream"}
-        mock_response.raise_for_status = Mock()
-        
-        with patch('src.core.mcp_client.requests.post', return_value=mock_response):
-            with patch('src.core.mcp_client.SSEClient', return_value=mock_sse_client):
-                with patch('uuid.uuid4', return_value=Mock(__str__=lambda x: request_id)):
-                    result = await client._send_jsonrpc_request("test/method")
-                    
-                    assert result == {"success": True}
-
+        result = await mcp_client.call_tool("test_tool", {"param": "value"})
+        assert result == tool_result
+        assert mock_request.call_count == 2
@@ -1,55 +1,162 @@
 #!/usr/bin/env python3
 """
 Test script to verify MCP server connection and list available tools.
+
+Options:
+    --cached      Show the tool list from the last successful run instead of connecting
+    --names-only  List only the tool names
+    --debug       Print the full traceback on failure
+
+Exits with 1 on failure, or 2 if connecting exceeds MCP_CONNECT_TIMEOUT seconds.
 """
 
 import asyncio
+import hashlib
+import orjson
 import os
 import sys
+from contextlib import asynccontextmanager
 
 # Ensure project root is on sys.path when running this file directly
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if PROJECT_ROOT not in sys.path:
-    sys.path.insert(0, PROJECT_ROOT)
+# (pytest resolves it from rootdir, so imports skip this)
+if __name__ == "__main__":
+    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+
+from src.core import mcp_client as mcp_client_module
+from src.core.mcp_client import get_mcp_client, close_mcp_client
+
+# Tool listing from the last successful connection
+CACHE_PATH = os.path.join(os.path.dirname(__file__), ".mcp_tools_cache.json")
+
+# Seconds to wait for the connection and tools/list handshake
+CONNECT_TIMEOUT = float(os.getenv('MCP_CONNECT_TIMEOUT', '10'))
+
+# Exit status when the handshake times out, so CI can tell it apart from errors
+EXIT_TIMEOUT = 2
+
+# Section separators for the report
+BANNER = "=" * 60
+RULE = "-" * 60
 
-from src.core.mcp_client import get_mcp_client
 
+def _cache_key(names_only: bool) -> str:
+    """Hash of the inputs that determine the listing (server URL, client, this script and mode)."""
+    server_url = os.getenv('MCP_SERVER_URL', '')
+    client_mtime = os.path.getmtime(mcp_client_module.__file__)
+    script_mtime = os.path.getmtime(__file__)
+    return hashlib.sha256(
+        f"{server_url}|{client_mtime}|{script_mtime}|{names_only}".encode()
+    ).hexdigest()
 
-async def main():
-    """Test MCP client connection."""
-    print("=" * 60)
+
+def _load_cached_listing(key: str):
+    """Return the cached {"count", "listing"} entry, or None if missing or stale."""
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            cached = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    return cached if cached.get("key") == key else None
+
+
+def _save_cached_listing(key: str, count: int, listing: str):
+    """Write the rendered tool listing to the cache file."""
+    with open(CACHE_PATH, "wb") as f:
+        f.write(orjson.dumps({"key": key, "count": count, "listing": listing}))
+
+
+@asynccontextmanager
+async def mcp_client_session():
+    """Yield the shared MCP client and close it on exit, even if the check fails."""
+    try:
+        yield await asyncio.wait_for(get_mcp_client(), CONNECT_TIMEOUT)
+    finally:
+        await close_mcp_client()
+
+
+def _format_tool(i: int, tool, names_only: bool = False) -> str:
+    """Format one tool's name, description and parameters for display."""
+    if names_only:
+        return f"{i}. {tool['name']}"
+    
+    lines = [f"\n{i}. {tool['name']}", f"   Description: {tool.get('description', 'N/A')}"]
+    if 'inputSchema' in tool:
+        schema = tool['inputSchema']
+        if 'properties' in schema:
+            lines.append(f"   Parameters: {', '.join(schema['properties'].keys())}")
+    return "\n".join(lines)
+
+
+def _format_listing(tools, names_only: bool = False) -> str:
+    """Render the tool names, descriptions and parameters as one block of text."""
+    lines = ["Available MCP Tools:", RULE]
+    lines.extend(_format_tool(i, tool, names_only) for i, tool in enumerate(tools, 1))
+    return "\n".join(lines) + "\n"
+
+
+async def main(use_cache: bool = False, debug: bool = False, names_only: bool = False) -> int:
+    """
+    Test MCP client connection.
+    
+    Args:
+        use_cache: Show the cached tool list if it is still valid instead of connecting
+        debug: Print the full traceback on failure
+        names_only: List only tool names, skipping descriptions and input schemas
+    
+    Returns:
+        Process exit status (0 on success, 1 on failure, EXIT_TIMEOUT on timeout)
+    """
+    print(BANNER)
     print("Testing MCP Server Connection")
-    print("=" * 60)
+    print(BANNER)
     
     try:
-        # Get MCP client
-        client = await get_mcp_client()
+        key = _cache_key(names_only)
+        cached = _load_cached_listing(key) if use_cache else None
         
-        print(f"\n✓ Successfully connected to MCP server")
-        print(f"✓ Found {len(client.tools)} tools\n")
+        if cached is not None:
+            # Rendered when the cache was written, so a hit only writes the text
+            print(f"\n✓ Loaded {cached['count']} tools from {CACHE_PATH}\n")
+            sys.stdout.write(cached["listing"])
+            return 0
         
-        # Display tools
-        print("Available MCP Tools:")
-        print("-" * 60)
-        for i, tool in enumerate(client.tools, 1):
-            print(f"\n{i}. {tool['name']}")
-            print(f"   Description: {tool.get('description', 'N/A')}")
-            if 'inputSchema' in tool:
-                schema = tool['inputSchema']
-                if 'properties' in schema:
-                    print(f"   Parameters: {', '.join(schema['properties'].keys())}")
+        async with mcp_client_session() as client:
+            print(f"\n✓ Successfully connected to MCP server")
+            print(f"✓ Found {len(client.tools)} tools\n")
+            
+            listing = _format_listing(client.tools, names_only)
+            sys.stdout.write(listing)
+            _save_cached_listing(key, len(client.tools), listing)
         
-        print("\n" + "=" * 60)
+        print("\n" + BANNER)
         print("MCP Client Test Completed Successfully!")
-        print("=" * 60)
-        
-        await client.close()
-        
+        print(BANNER)
+        return 0
+    
+    except asyncio.TimeoutError:
+        print(f"\n✗ Timed out after {CONNECT_TIMEOUT}s connecting to MCP server")
+        return EXIT_TIMEOUT
+    
     except Exception as e:
-        print(f"\n✗ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"\n✗ Error: {e!r}")
+        if debug:
+            import traceback
+            traceback.print_exc()
+        return 1
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Same event loop as the server (see run_server.py) when it is available
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    args = sys.argv[1:]
+    sys.exit(run(main(
+        use_cache="--cached" in args,
+        debug="--debug" in args,
+        names_only="--names-only" in args
+    )))
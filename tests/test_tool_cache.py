@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tool_cache.py
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.core import tool_cache
+from src.core.tool_cache import (
+    get_cached_tools,
+    get_cached_mcp_tools,
+    get_read_only_tools,
+    invalidate_tools
+)
+from src.core.llm_client import ToolDefinition
+from src.core.mcp_client import MCPClient
+
+
+TOOLS = [
+    {
+        "name": "test_tool",
+        "description": "A test tool",
+        "inputSchema": {"properties": {"param1": {"type": "string"}}}
+    }
+]
+
+
+class TestToolCache:
+    """Test suite for the MCP tool cache."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        """Start every test with an empty cache."""
+        invalidate_tools()
+        yield
+        invalidate_tools()
+    
+    @pytest.fixture
+    def mock_mcp_client(self):
+        """Fixture providing a mocked MCP client with one tool."""
+        mock_client = AsyncMock(spec=MCPClient)
+        mock_client.tools = TOOLS
+        mock_client.list_tools = AsyncMock(return_value=TOOLS)
+        return mock_client
+    
+    @pytest.mark.asyncio
+    async def test_formats_tools(self, mock_mcp_client):
+        """Test tools are converted to ToolDefinition models with an object schema."""
+        result = await get_cached_tools(mock_mcp_client)
+        
+        assert len(result) == 1
+        assert isinstance(result[0], ToolDefinition)
+        assert result[0].function.name == "test_tool"
+        assert result[0].function.parameters["type"] == "object"
+    
+    @pytest.mark.asyncio
+    async def test_no_tools_returns_none(self, mock_mcp_client):
+        """Test an empty tool list formats to None."""
+        mock_mcp_client.tools = []
+        
+        assert await get_cached_tools(mock_mcp_client) is None
+        assert await get_cached_mcp_tools(mock_mcp_client) == []
+    
+    @pytest.mark.asyncio
+    async def test_read_only_tools_from_annotations(self, mock_mcp_client):
+        """Test only tools annotated with readOnlyHint are reported as read-only."""
+        mock_mcp_client.tools = [
+            {"name": "list_products", "annotations": {"readOnlyHint": True}},
+            {"name": "create_order", "annotations": {"readOnlyHint": False}},
+            {"name": "unannotated"}
+        ]
+        
+        assert await get_read_only_tools(mock_mcp_client) == {"list_products"}
+    
+    @pytest.mark.asyncio
+    async def test_cached_within_ttl(self, mock_mcp_client):
+        """Test repeated lookups reuse the same snapshot without refetching."""
+        result1 = await get_cached_tools(mock_mcp_client)
+        result2 = await get_cached_tools(mock_mcp_client)
+        
+        assert result1 is result2
+        mock_mcp_client.list_tools.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_refetches_after_ttl(self, mock_mcp_client):
+        """Test the tool list is refetched from the server once the TTL expires."""
+        result1 = await get_cached_tools(mock_mcp_client)
+        
+        with patch('src.core.tool_cache.time.monotonic', return_value=tool_cache._cache.expires_at):
+            result2 = await get_cached_tools(mock_mcp_client)
+        
+        assert result1 is not result2
+        mock_mcp_client.list_tools.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_keeps_snapshot_when_refresh_fails(self, mock_mcp_client):
+        """Test a failed refresh serves the previous snapshot and backs off before retrying."""
+        result1 = await get_cached_tools(mock_mcp_client)
+        expired = tool_cache._cache.expires_at
+        mock_mcp_client.list_tools = AsyncMock(side_effect=Exception("Server down"))
+        
+        with patch('src.core.tool_cache.time.monotonic', return_value=expired):
+            result2 = await get_cached_tools(mock_mcp_client)
+            result3 = await get_cached_tools(mock_mcp_client)
+        
+        assert result1 is result2 is result3
+        mock_mcp_client.list_tools.assert_called_once()
+        assert tool_cache._cache.expires_at == expired + tool_cache.TOOLS_REFRESH_RETRY
+    
+    @pytest.mark.asyncio
+    async def test_uses_shared_client_by_default(self, mock_mcp_client):
+        """Test the shared MCP client is used when none is given."""
+        with patch('src.core.tool_cache.get_mcp_client', return_value=mock_mcp_client):
+            result = await get_cached_mcp_tools()
+        
+        assert result == TOOLS